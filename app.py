@@ -3,21 +3,45 @@
 # Main application entry point
 import os
 import sys
+import argparse
 from PyQt5 import QtWidgets, QtGui
 
 # Application modules
 import core
+import diag
 import ui
 
+
+# 실행 인자: 기존 인스턴스에 전달할 명령 (기본 show)
+def parse_args(argv):
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--show", dest="command", action="store_const", const="show")
+    group.add_argument("--start", dest="command", action="store_const", const="start")
+    group.add_argument("--stop", dest="command", action="store_const", const="stop")
+    group.add_argument("--next", dest="command", action="store_const", const="next")
+    args, qt_args = parser.parse_known_args(argv[1:])
+    return args.command or "show", [argv[0]] + qt_args
+
 # Main function
 def main():
-    
+    command, qt_argv = parse_args(sys.argv)
+
+    # 이미 실행 중이면 명령만 넘기고 종료
+    if not core.acquire_instance_lock():
+        if core.send_instance_command(command):
+            core.write_log(f"이미 실행 중인 인스턴스에 '{command}' 전달 후 종료")
+            sys.exit(0)
+        core.write_log(f"이미 실행 중인 인스턴스가 응답하지 않음('{command}') → 종료")
+        sys.exit(1)
+
     cfg_path = os.path.join(core.BASE_DIR, "config.json")
     cfg = core.load_config(cfg_path)
 
-    app = QtWidgets.QApplication(sys.argv)
+    app = QtWidgets.QApplication(qt_argv)
     ui.setup_app_style(app)
 
+    diag.install(cfg, (ui.MainWindow, ui.EqualizerWidget, ui.StatusDotWidget))
     win = ui.MainWindow(cfg)
 
     icon_file = cfg.get("ui", {}).get("icon_file", "icon.png")
@@ -25,7 +49,13 @@ def main():
     if os.path.exists(icon_path):
         win.setWindowIcon(QtGui.QIcon(icon_path))
 
+    server = core.InstanceServer()
+    server.command_received.connect(win.handle_instance_command)
+    server.listen()
+
     win.show()
+    if command != "show":
+        win.handle_instance_command(command)
     sys.exit(app.exec_())
 
 
@@ -5,30 +5,49 @@ import os
 import sys
 import time
 import json
+import getpass
+import socket
 import math
 import random
 import datetime
 import subprocess
 import threading
+import queue
+import collections
+import urllib.parse
+import urllib.request
 import ctypes
 from ctypes import wintypes
 
 # Third-party modules
 import psutil
-from PyQt5 import QtCore
+from PyQt5 import QtCore, QtNetwork
 
 
 # 경로 설정
 TEMP_DIR = os.getenv("TEMP") or os.getcwd()
 PROFILE_DIR = os.path.join(TEMP_DIR, "MusicBotProfile")
 LOG_FILE = os.path.join(TEMP_DIR, "MusicBot_Debug.txt") # 로그 파일 경로 tmp에 있음
+LATENCY_FILE = os.path.join(TEMP_DIR, "MusicBot_LaunchLatency.json") # 장비별 시작 지연 기록
 
 BASE_DIR = os.path.dirname(os.path.abspath(sys.argv[0]))
 
 
+# 시계 (리플레이/테스트에서 가짜 시계로 교체 가능)
+class SystemClock:
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def time(self) -> float:
+        return time.time()
+
+
+clock = SystemClock()
+
+
 # 로그 기록
 def write_log(msg: str):
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = clock.now().strftime("%Y-%m-%d %H:%M:%S")
     line = f"[{ts}] {msg}"
     try:
         with open(LOG_FILE, "a", encoding="utf-8") as f:
@@ -49,12 +68,32 @@ def parse_hhmm(hhmm: str) -> tuple[int, int]:
     hh, mm = hhmm.strip().split(":")
     return int(hh), int(mm)
 
-# 트랙 URL 무작위 선택
-def pick_track_url(cfg: dict) -> str:
-    tracks = cfg.get("tracks") or []
+# 트랙 URL 무작위 선택 (exclude는 가능하면 피함)
+def pick_track_url(cfg: dict, tracks: list = None, exclude: str = None) -> str:
+    if tracks is None:
+        tracks = cfg.get("tracks") or []
     if not tracks:
         return ""
-    return random.choice(tracks)
+    candidates = [t for t in tracks if t != exclude] or tracks
+    return random.choice(candidates)
+
+# 시간대별 플레이리스트 파싱: [(name, 시작분, 종료분, tracks), ...]
+def parse_playlists(cfg: dict) -> list:
+    playlists = []
+    for i, item in enumerate(cfg.get("playlists") or []):
+        sh, sm = parse_hhmm(item["from"])
+        eh, em = parse_hhmm(item["to"])
+        name = item.get("name") or f"playlist{i + 1}"
+        playlists.append((name, sh * 60 + sm, eh * 60 + em, item.get("tracks") or []))
+    return playlists
+
+# 현재 시각의 플레이리스트 (해당 없으면 기본 tracks)
+def playlist_for_time(playlists: list, now: datetime.datetime, default_tracks: list) -> tuple:
+    minute = now.hour * 60 + now.minute
+    for name, start, end, tracks in playlists:
+        if start <= minute < end and tracks:
+            return name, tracks
+    return "default", default_tracks
 
 
 
@@ -71,14 +110,19 @@ IsWindowVisible = user32.IsWindowVisible # 창이 보이는지
 SetForegroundWindow = user32.SetForegroundWindow # 창 포그라운드로
 ShowWindow = user32.ShowWindow # 창 보이기/숨기기
 GetWindowThreadProcessId = user32.GetWindowThreadProcessId # 프로세스 ID 얻기
+IsWindow = user32.IsWindow # 창 핸들이 살아있는지
 
 # ShowWindow 명령어 
 SW_RESTORE = 9 
 
+# 창 닫기 메시지
+WM_CLOSE = 0x0010
+
 # 키보드 메시지 
 WM_KEYDOWN = 0x0100
 WM_KEYUP = 0x0101
 VK_F = 0x46
+VK_F5 = 0x74
 
 
 # 유튜브 창 제목 정리
@@ -98,15 +142,23 @@ def clean_youtube_title(raw: str) -> str:
     return raw.strip()
 
 # 유튜브 창 찾기
-def find_youtube_window(exclude_hwnd=None):
+def find_youtube_window(exclude_hwnd=None, pids=None):
+    """pids가 주어지면 해당 프로세스들이 소유한 창만 검사 (제목 읽기 전에 PID로 걸러냄)"""
 
     found_hwnd = [None]
     found_title = [""]
+    pid_dword = wintypes.DWORD()
+    pid_ref = ctypes.byref(pid_dword)
 
     def enum_proc(hwnd, lParam):
         if exclude_hwnd and int(hwnd) == int(exclude_hwnd):
             return True
 
+        if pids is not None:
+            GetWindowThreadProcessId(hwnd, pid_ref)
+            if pid_dword.value not in pids:
+                return True
+
         if not IsWindowVisible(hwnd):
             return True
 
@@ -130,6 +182,12 @@ def find_youtube_window(exclude_hwnd=None):
     EnumWindows(WNDENUMPROC(enum_proc), 0)
     return found_hwnd[0], found_title[0]
 
+# 창 핸들의 소유 프로세스 ID
+def get_window_pid(hwnd) -> int:
+    pid_dword = wintypes.DWORD()
+    GetWindowThreadProcessId(hwnd, ctypes.byref(pid_dword))
+    return pid_dword.value
+
 # F 키 메시지 보내기 (전체화면)
 def send_f_to_window(hwnd):
     """특정 창에 직접 F 키 메시지 전달(PostMessage)"""
@@ -150,6 +208,80 @@ def send_f_to_window(hwnd):
         write_log(f"F키 전송 실패: {e}")
 
 
+# F5 키 메시지 보내기 (페이지 새로고침)
+def send_reload_to_window(hwnd):
+    """특정 창에 F5 키 메시지 전달(PostMessage)"""
+    if not hwnd:
+        return
+    try:
+        user32.PostMessageW(hwnd, WM_KEYDOWN, VK_F5, 0)
+        time.sleep(0.05)
+        user32.PostMessageW(hwnd, WM_KEYUP, VK_F5, 0)
+        write_log("유튜브 창에 F5 키 메시지(PostMessage) 전송 시도")
+    except Exception as e:
+        write_log(f"F5키 전송 실패: {e}")
+
+# 창 핸들 생존 여부
+def is_window_alive(hwnd) -> bool:
+    if not hwnd:
+        return False
+    try:
+        return bool(IsWindow(hwnd))
+    except Exception:
+        return False
+
+
+# ================== Process tree ==================
+# 실행한 브라우저 프로세스 트리의 PID 집합 캐시
+class ProcessTreePids:
+    """
+    루트 PID와 자식 프로세스 PID 집합. 캐시된 프로세스 중 하나가 종료됐을 때만 다시 수집.
+    루트가 이미 없으면(기존 브라우저에 넘기고 종료 등) 프로필 디렉토리를 쓰는 프로세스로 대체.
+    """
+
+    def __init__(self, root_pid: int, profile_dir: str = None):
+        self.root_pid = root_pid
+        self.profile_dir = profile_dir or PROFILE_DIR
+        self.pids = frozenset()
+        self._procs = []
+        self.refresh()
+
+    def refresh(self):
+        procs = []
+        try:
+            root = psutil.Process(self.root_pid)
+            procs = [root] + root.children(recursive=True)
+        except Exception:
+            procs = list(_profile_processes(self.profile_dir))
+        self._procs = procs
+        self.pids = frozenset(p.pid for p in procs)
+
+    def changed(self) -> bool:
+        for p in self._procs:
+            try:
+                if not p.is_running():
+                    return True
+            except Exception:
+                return True
+        return not self._procs
+
+    def get(self, force: bool = False) -> frozenset:
+        if force or self.changed():
+            self.refresh()
+        return self.pids
+
+
+def _profile_processes(profile_dir: str):
+    target = profile_dir.lower()
+    for proc in psutil.process_iter(["pid", "cmdline"]):
+        try:
+            cmdline = " ".join(proc.info.get("cmdline") or []).lower()
+        except Exception:
+            continue
+        if target in cmdline:
+            yield proc
+
+
 # ================== Process kill ==================
 # 프로필 디렉토리 포함 프로세스 종료 (fallback)
 def kill_profile_processes(profile_dir: str = PROFILE_DIR):
@@ -175,108 +307,1159 @@ def kill_profile_processes(profile_dir: str = PROFILE_DIR):
     write_log(f"  종료된 PID 목록: {killed}")
     write_log("[fallback] 프로필 프로세스 정밀 종료 완료")
 
-# 루트 PID 기준으로 자식까지 종료 (듀온 다 꺼짐)
-def kill_process_tree(root_pid: int):
-    """루트 PID 기준으로 자식까지 종료"""
-    if not root_pid:
-        write_log("kill_process_tree: root_pid 없음")
-        return
 
+# ================== Window scanner ==================
+# 창 탐색 결과 (불변). tracked_*는 GUI가 추적 중인 창 핸들의 생존 여부
+WindowSnapshot = collections.namedtuple(
+    "WindowSnapshot",
+    "generation hwnd pid raw_title title detected_at scanned_at tracked_hwnd tracked_alive cpu_percent",
+)
+
+
+# 유튜브 창 1회 탐색 → 스냅샷
+def scan_youtube_window(backend, exclude_hwnd, tracked_hwnd, now: float, generation=None,
+                        detected_at=None, cpu_percent=None, root_pid=None) -> WindowSnapshot:
+    # 실행한 브라우저의 PID를 알기 전에는 데스크톱 전체를 뒤지지 않음
+    if root_pid:
+        hwnd, raw = backend.find_youtube_window(exclude_hwnd=exclude_hwnd, root_pid=root_pid)
+    else:
+        hwnd, raw = None, ""
+    if not hwnd or not raw:
+        hwnd, raw = None, ""
+    pid = backend.get_window_pid(hwnd) if hwnd else None
+    alive = backend.is_window_alive(tracked_hwnd) if tracked_hwnd else None
+    return WindowSnapshot(
+        generation,
+        int(hwnd) if hwnd else None,
+        pid,
+        raw,
+        clean_youtube_title(raw),
+        detected_at if detected_at is not None else now,
+        now,
+        tracked_hwnd,
+        alive,
+        cpu_percent,
+    )
+
+
+class WindowScanner(QtCore.QObject):
+    """
+    전용 스레드에서 유튜브 창 탐색/제목 읽기/CPU 측정을 수행하고
+    내용이 바뀐 경우에만 snapshot 시그널로 GUI에 전달
+    """
+    snapshot = QtCore.pyqtSignal(object)
+
+    def __init__(self, backend, exclude_hwnd: int, interval_ms: int = 1000, cpu_interval: float = 10.0):
+        super().__init__()
+        self.backend = backend
+        self.exclude_hwnd = exclude_hwnd
+        self.interval_ms = interval_ms
+        self.cpu_interval = cpu_interval
+
+        self._lock = threading.Lock()
+        self._generation = None
+        self._root_pid = None
+        self._tracked_hwnd = None
+
+        self._timer = None
+        self._last_key = None
+        self._detected_generation = None
+        self._detected = {}
+        self._sampler = None
+        self._cpu_sampled = None
+
+        self._thread = QtCore.QThread()
+        self._thread.setObjectName("WindowScanner")
+        self.moveToThread(self._thread)
+        self._thread.started.connect(self._start_timer)
+        # finished는 스캐너 스레드 안에서 emit: 타이머는 만든 스레드에서 멈춰야 함
+        self._thread.finished.connect(self._stop_timer, QtCore.Qt.DirectConnection)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout_ms: int = 2000):
+        self.set_target(None)
+        self._thread.quit()
+        self._thread.wait(timeout_ms)
+
+    # GUI 스레드에서 호출 (generation=None이면 탐색 중지)
+    def set_target(self, generation, root_pid=None, tracked_hwnd=None):
+        with self._lock:
+            self._generation = generation
+            self._root_pid = root_pid
+            self._tracked_hwnd = tracked_hwnd
+
+    @QtCore.pyqtSlot()
+    def _start_timer(self):
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._scan)
+        self._timer.start(self.interval_ms)
+
+    @QtCore.pyqtSlot()
+    def _stop_timer(self):
+        if self._timer is not None:
+            self._timer.stop()
+
+    @QtCore.pyqtSlot()
+    def _scan(self):
+        with self._lock:
+            generation, root_pid, tracked = self._generation, self._root_pid, self._tracked_hwnd
+        if generation is None:
+            self._last_key = None
+            self._detected = {}
+            self._sampler = None
+            return
+
+        now = clock.time()
+        try:
+            cpu = self._sample_cpu(root_pid, now)
+            snap = scan_youtube_window(
+                self.backend, self.exclude_hwnd, tracked, now, generation, cpu_percent=cpu, root_pid=root_pid,
+            )
+        except Exception as e:
+            write_log(f"창 탐색 실패: {e}")
+            return
+
+        if generation != self._detected_generation:
+            self._detected_generation = generation
+            self._detected = {}
+        if snap.hwnd:
+            detected_at = self._detected.setdefault(snap.hwnd, now)
+            snap = snap._replace(detected_at=detected_at)
+
+        key = (snap.generation, snap.hwnd, snap.pid, snap.raw_title, snap.tracked_hwnd, snap.tracked_alive)
+        if key == self._last_key and cpu is None:
+            return
+        self._last_key = key
+        self.snapshot.emit(snap)
+
+    def _sample_cpu(self, root_pid, now: float):
+        if not root_pid:
+            return None
+        if self._sampler is None or self._sampler.root_pid != root_pid:
+            self._sampler = self.backend.cpu_sampler(root_pid)
+            self._cpu_sampled = None
+        if self._cpu_sampled is not None and now - self._cpu_sampled < self.cpu_interval:
+            return None
+        self._cpu_sampled = now
+        return self._sampler.sample(now)
+
+
+# ================== Playback watchdog ==================
+# 프로세스 트리 CPU 사용률 측정
+class ProcessTreeCpuSampler:
+    """루트 PID 기준 프로세스 트리의 CPU 사용률(%) 측정 (코어 1개 = 100%)"""
+
+    def __init__(self, root_pid: int):
+        self.root_pid = root_pid
+        self._last_times = {}
+        self._last_wall = None
+
+    def sample(self, now: float):
+        try:
+            root = psutil.Process(self.root_pid)
+            procs = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+
+        times = {}
+        for p in procs:
+            try:
+                t = p.cpu_times()
+                times[p.pid] = t.user + t.system
+            except Exception:
+                continue
+
+        percent = None
+        if self._last_wall is not None and now > self._last_wall:
+            busy = sum(
+                max(cur - self._last_times[pid], 0.0)
+                for pid, cur in times.items()
+                if pid in self._last_times
+            )
+            percent = busy / (now - self._last_wall) * 100.0
+
+        self._last_times = times
+        self._last_wall = now
+        return percent
+
+
+# 워치독 복구 기록 (ttr=None이면 복구 실패/포기)
+class RecoveryRecord:
+    GAVE_UP = "gave_up"
+
+    def __init__(self, reason: str, started: float):
+        self.reason = reason
+        self.started = started
+        self.actions = []
+        self.ttr = None
+
+    @property
+    def gave_up(self) -> bool:
+        return self.GAVE_UP in self.actions
+
+    def __repr__(self):
+        return f"RecoveryRecord(reason={self.reason!r}, actions={self.actions!r}, ttr={self.ttr!r})"
+
+
+# 재생 정지(stall) 감지 + 단계별 복구
+class PlaybackWatchdog:
+    """제목 변화 주기, 창 생존, 프로세스 트리 CPU로 재생 정지 감지"""
+
+    ACTION_RELOAD = "reload"
+    ACTION_RELAUNCH = "relaunch"
+
+    def __init__(self, cfg: dict):
+        wd = cfg.get("watchdog", {})
+        self.enabled = bool(wd.get("enabled", True))
+        self.first_title_timeout = float(wd.get("first_title_timeout_sec", 90))
+        self.max_title_age = float(wd.get("max_title_age_min", 30)) * 60
+        self.idle_cpu_percent = float(wd.get("idle_cpu_percent", 1.0))
+        self.idle_grace = float(wd.get("idle_grace_sec", 90))
+        self.cpu_sample_interval = float(wd.get("cpu_sample_sec", 10))
+        self.recovery_timeout = float(wd.get("recovery_timeout_sec", 45))
+        self.max_relaunches = int(wd.get("max_relaunches", 3))
+
+        self.recoveries = []
+        self.stall = None
+        self._action_time = None
+        self._relaunches = 0
+        self._gave_up = False
+        self.begin_session(clock.time())
+
+    # 브라우저 (재)실행마다 호출. 진행 중인 복구 기록은 유지
+    def begin_session(self, now: float):
+        self.session_start = now
+        self.title = ""
+        self.title_changed = now
+        self.cpu_percent = None
+        self.cpu_sampled = None
+        self.cpu_active = now
+
+    # 재생 중지 시 진행 중인 복구 취소
+    def abort(self):
+        if self.stall is not None:
+            write_log(f"워치독: 재생 중지로 복구 중단 (reason={self.stall.reason})")
+        self.stall = None
+        self._relaunches = 0
+        self._gave_up = False
+
+    def cpu_sample_due(self, now: float) -> bool:
+        return self.cpu_sampled is None or (now - self.cpu_sampled) >= self.cpu_sample_interval
+
+    def observe_cpu(self, now: float, percent):
+        if percent is None:
+            return
+        self.cpu_percent = percent
+        self.cpu_sampled = now
+        if percent >= self.idle_cpu_percent:
+            self.cpu_active = now
+
+    def observe(self, now: float, title: str, window_alive):
+        """
+        title: 현재 인식된 곡 제목("" = 아직 없음)
+        window_alive: 추적 중인 창 핸들 생존 여부(None = 아직 창 없음)
+        반환: 실행할 복구 동작(ACTION_*) 또는 None
+        """
+        if title and title != self.title:
+            self.title = title
+            self.title_changed = now
+
+        if not self.enabled:
+            return None
+
+        if self.stall is not None:
+            if self._gave_up:
+                # 포기한 복구는 이미 기록됨: 재생이 다시 확인되면 감지만 재개
+                if self._recovered(now, window_alive):
+                    write_log(f"워치독: 복구 포기 후 재생 확인 (reason={self.stall.reason})")
+                    self.stall = None
+                    self._relaunches = 0
+                    self._gave_up = False
+                return None
+            if self._recovered(now, window_alive):
+                self.stall.ttr = now - self.stall.started
+                self.recoveries.append(self.stall)
+                write_log(
+                    f"워치독 복구 완료: reason={self.stall.reason}, "
+                    f"action={'>'.join(self.stall.actions)}, ttr={self.stall.ttr:.1f}s"
+                )
+                self.stall = None
+                self._relaunches = 0
+                return None
+            if now - self._action_time < self.recovery_timeout:
+                return None
+            if self._relaunches >= self.max_relaunches:
+                self._give_up(now)
+                return None
+            if self._relaunches == 0 and self.stall.actions:
+                write_log(f"워치독: 새로고침 후 {self.recovery_timeout:.0f}초 내 복구 안됨 → 브라우저 재실행")
+            return self._act(now, self.ACTION_RELAUNCH)
+
+        reason = self._stall_reason(now, window_alive)
+        if not reason:
+            return None
+
+        self.stall = RecoveryRecord(reason, now)
+        write_log(f"워치독: 재생 정지 감지 (reason={reason})")
+        if reason in ("window_lost", "no_window"):
+            return self._act(now, self.ACTION_RELAUNCH)
+        return self._act(now, self.ACTION_RELOAD)
+
+    def _give_up(self, now: float):
+        self.stall.actions.append(RecoveryRecord.GAVE_UP)
+        self.recoveries.append(self.stall)
+        self._gave_up = True
+        write_log(
+            f"워치독 복구 포기: reason={self.stall.reason}, "
+            f"action={'>'.join(self.stall.actions)}, 경과 {now - self.stall.started:.1f}s"
+        )
+
+    def slo_summary(self) -> str:
+        """복구 성공/포기 횟수와 복구 시간 백분위"""
+        ttrs = sorted(r.ttr for r in self.recoveries if r.ttr is not None)
+        gave_up = sum(1 for r in self.recoveries if r.gave_up)
+        text = f"복구 {len(ttrs)}회, 포기 {gave_up}회"
+        if ttrs:
+            p50 = ttrs[(len(ttrs) - 1) // 2]
+            p90 = ttrs[max(int(math.ceil(0.9 * len(ttrs))) - 1, 0)]
+            text += f", ttr p50 {p50:.1f}s / p90 {p90:.1f}s / 최대 {ttrs[-1]:.1f}s"
+        return text
+
+    def _stall_reason(self, now: float, window_alive):
+        if window_alive is False:
+            return "window_lost"
+        if not self.title:
+            if now - self.session_start >= self.first_title_timeout:
+                return "no_window"
+            return None
+        if now - self.title_changed >= self.max_title_age:
+            return "title_stale"
+        if self.cpu_sampled is not None and now - self.cpu_active >= self.idle_grace:
+            return "cpu_idle"
+        return None
+
+    def _recovered(self, now: float, window_alive) -> bool:
+        if window_alive is not True or not self.title:
+            return False
+        if self.title_changed > self._action_time:
+            return True
+        return self.cpu_sampled is not None and self.cpu_active > self._action_time
+
+    def _act(self, now: float, action: str):
+        self.stall.actions.append(action)
+        self._action_time = now
+        if action == self.ACTION_RELAUNCH:
+            self._relaunches += 1
+        else:
+            # 새로고침은 곡을 처음부터 다시 재생하므로 제목 경과 시간도 초기화
+            self.title_changed = now
+        self.cpu_active = now
+        return action
+
+
+# ================== Launch lead ==================
+
+# 시작 지연(재생 트리거 → 곡 제목 인식) 기록, 최근 값의 백분위만큼 자동 시작을 앞당김
+class LaunchLatencyModel:
+    """path=None이면 메모리에만 유지 (리플레이/테스트용)"""
+
+    def __init__(self, cfg: dict, path: str = None):
+        lead = cfg.get("launch_lead", {})
+        self.enabled = bool(lead.get("enabled", True))
+        self.percentile = float(lead.get("percentile", 90))
+        self.min_samples = int(lead.get("min_samples", 3))
+        self.min_lead = float(lead.get("min_lead_sec", 0))
+        self.max_lead = float(lead.get("max_lead_sec", 120))
+        self.path = path
+        self.samples = collections.deque(maxlen=int(lead.get("window", 30)))
+        self._load()
+        self.lead = self._compute_lead()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.samples.extend(float(v) for v in data.get("samples", []))
+        except Exception as e:
+            write_log(f"시작 지연 기록 읽기 실패: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"samples": [round(v, 2) for v in self.samples]}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            write_log(f"시작 지연 기록 저장 실패: {e}")
+
+    def record(self, latency: float):
+        if latency < 0:
+            return
+        self.samples.append(latency)
+        self.lead = self._compute_lead()
+        self._save()
+        write_log(f"시작 지연 기록: {latency:.1f}s → 앞당김 {self.lead:.0f}s ({self.summary()})")
+
+    def quantile(self):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(int(math.ceil(self.percentile / 100.0 * len(ordered))) - 1, 0)
+        return ordered[rank]
+
+    def _compute_lead(self) -> float:
+        if not self.enabled or len(self.samples) < self.min_samples:
+            return self.min_lead if self.enabled else 0.0
+        return min(max(self.quantile(), self.min_lead), self.max_lead)
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "기록 없음"
+        ordered = sorted(self.samples)
+        return (
+            f"n={len(ordered)}, 중앙값 {ordered[len(ordered) // 2]:.1f}s, "
+            f"p{self.percentile:.0f} {self.quantile():.1f}s, 최대 {ordered[-1]:.1f}s"
+        )
+
+
+# ================== Player events ==================
+# 재생 상태 변화를 문자열 대신 타입으로 전달 (UI/로그/통계가 각각 구독)
+class PlayerEvent:
+    kind = "event"
+    coalesce = False  # True면 GUI 전달 전에 같은 종류는 마지막 것만 남김
+    error = False
+
+    def __init__(self, session=None):
+        self.ts = clock.time()
+        self.session = session
+
+    def message(self) -> str:
+        return self.kind
+
+    def log_lines(self) -> list:
+        return [self.message()]
+
+    def to_dict(self) -> dict:
+        d = {k: v for k, v in vars(self).items() if v is None or isinstance(v, (str, int, float, bool, list))}
+        d["kind"] = self.kind
+        return d
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+class LaunchStarted(PlayerEvent):
+    kind = "launch_started"
+
+    def __init__(self, url: str, command: list, session=None):
+        super().__init__(session)
+        self.url = url
+        self.command = command
+
+    def message(self) -> str:
+        return f"재생 URL: {self.url}"
+
+    def log_lines(self) -> list:
+        return [self.message(), f"브라우저 실행 명령: {' '.join(self.command)}"]
+
+
+class Launched(PlayerEvent):
+    kind = "launched"
+
+    def __init__(self, pid: int, session=None):
+        super().__init__(session)
+        self.pid = pid
+
+    def message(self) -> str:
+        return f"브라우저 실행 (PID: {self.pid})"
+
+
+class WindowDetected(PlayerEvent):
+    kind = "window_detected"
+
+    def __init__(self, hwnd: int, pid: int, title: str, session=None):
+        super().__init__(session)
+        self.hwnd = hwnd
+        self.pid = pid
+        self.title = title
+
+    def message(self) -> str:
+        return f"YouTube 창 핸들 감지: hwnd={self.hwnd}, pid={self.pid}, title={self.title}"
+
+
+class TrackChanged(PlayerEvent):
+    kind = "track_changed"
+    coalesce = True
+
+    def __init__(self, title: str, session=None):
+        super().__init__(session)
+        self.title = title
+
+    def message(self) -> str:
+        return f"현재 곡 인식/갱신: {self.title}"
+
+
+class FullscreenSent(PlayerEvent):
+    kind = "fullscreen_sent"
+
+    def __init__(self, hwnd: int, session=None):
+        super().__init__(session)
+        self.hwnd = hwnd
+
+    def message(self) -> str:
+        return "전체화면 조건 만족 → F 키 전송"
+
+
+class TrackSwitched(PlayerEvent):
+    kind = "track_switched"
+
+    def __init__(self, url: str, elapsed: float, session=None):
+        super().__init__(session)
+        self.url = url
+        self.elapsed = elapsed
+
+    def message(self) -> str:
+        return f"재생 URL 전환: {self.url} ({self.elapsed:.2f}s)"
+
+
+STOP_REASON_TEXT = {
+    "user": "사용자 정지",
+    "auto": "타이머 종료로 자동 중지",
+}
+
+
+class Stopping(PlayerEvent):
+    kind = "stopping"
+
+    def __init__(self, reason: str, session=None):
+        super().__init__(session)
+        self.reason = reason
+
+    def message(self) -> str:
+        return STOP_REASON_TEXT.get(self.reason, self.reason)
+
+    def log_lines(self) -> list:
+        return [f"stop_playback 호출: {self.message()}"]
+
+
+class Stopped(PlayerEvent):
+    kind = "stopped"
+
+    def __init__(self, reason: str, shutdown_path: str = "none", shutdown_sec: float = 0.0, session=None):
+        super().__init__(session)
+        self.reason = reason
+        self.shutdown_path = shutdown_path
+        self.shutdown_sec = shutdown_sec
+
+    def message(self) -> str:
+        return f"재생 종료 (reason={self.reason}, shutdown={self.shutdown_path}, {self.shutdown_sec:.2f}s)"
+
+
+class PlaybackError(PlayerEvent):
+    kind = "error"
+    error = True
+
+    def __init__(self, code: str, detail: str, session=None):
+        super().__init__(session)
+        self.code = code
+        self.detail = detail
+
+    def message(self) -> str:
+        if self.code == "browser_missing":
+            return f"브라우저 경로 없음: {self.detail}"
+        if self.code == "no_tracks":
+            return "tracks 설정이 비어있습니다(config.json)."
+        if self.code == "switch_failed":
+            return f"URL 전환 실패: {self.detail}"
+        return f"에러 발생: {self.detail}"
+
+
+# 이벤트 분배기
+class EventBus(QtCore.QObject):
+    """
+    publish()는 어느 스레드에서나 호출 가능.
+    - 일반 구독자: 발행한 스레드에서 바로 호출 (로그, 통계 등)
+    - gui=True 구독자: 이벤트를 모아(coalesce) GUI 스레드에서 한 번에 전달
+    """
+    _flush_requested = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._direct = []
+        self._gui = []
+        self._pending = []
+        self._flush_scheduled = False
+        self._flush_requested.connect(self._flush, QtCore.Qt.QueuedConnection)
+
+    def subscribe(self, handler, *kinds, gui: bool = False):
+        """kinds: 받을 이벤트 클래스(생략 시 전부)"""
+        (self._gui if gui else self._direct).append((tuple(kinds), handler))
+
+    # 구독자 하나가 실패해도 나머지 구독자/이벤트는 계속 전달
+    # (GUI 슬롯에서 처리되지 않은 예외는 PyQt5.5+에서 프로세스를 종료시킴)
+    @staticmethod
+    def _dispatch(handlers, event: PlayerEvent):
+        for kinds, handler in handlers:
+            if not kinds or isinstance(event, kinds):
+                try:
+                    handler(event)
+                except Exception as e:
+                    write_log(f"이벤트 처리 실패({event.kind}): {e}")
+
+    def publish(self, event: PlayerEvent):
+        self._dispatch(self._direct, event)
+
+        if not self._gui:
+            return
+        with self._lock:
+            if event.coalesce:
+                self._pending = [ev for ev in self._pending if type(ev) is not type(event)]
+            self._pending.append(event)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._flush_requested.emit()
+
+    @QtCore.pyqtSlot()
+    def _flush(self):
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._flush_scheduled = False
+        for event in batch:
+            self._dispatch(self._gui, event)
+
+
+# 로그 구독자
+def log_event(event: PlayerEvent):
+    for line in event.log_lines():
+        write_log(line)
+
+
+# 통계 구독자 (종류별 횟수, 마지막 발생 시각)
+class EventMetrics:
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.last_ts = {}
+
+    def record(self, event: PlayerEvent):
+        self.counts[event.kind] += 1
+        self.last_ts[event.kind] = event.ts
+
+
+# 최근 이벤트 기록 (조회/API용)
+class EventHistory:
+    def __init__(self, maxlen: int = 200):
+        self.events = collections.deque(maxlen=maxlen)
+
+    def record(self, event: PlayerEvent):
+        self.events.append(event)
+
+    def to_list(self) -> list:
+        return [ev.to_dict() for ev in list(self.events)]
+
+
+# ================== Graceful shutdown ==================
+# 브라우저 종료 결과 (path: graceful=창 닫기로 정상 종료, forced=일부 강제 종료, none=이미 종료됨)
+class ShutdownResult:
+    def __init__(self, path: str, elapsed: float, forced_pids: list):
+        self.path = path
+        self.elapsed = elapsed
+        self.forced_pids = forced_pids
+
+    def __repr__(self):
+        return f"ShutdownResult(path={self.path!r}, elapsed={self.elapsed:.2f}, forced_pids={self.forced_pids!r})"
+
+
+# 지정 PID들이 소유한 최상위 창 목록
+def windows_of_pids(pids) -> list:
+    found = []
+    pid_dword = wintypes.DWORD()
+    pid_ref = ctypes.byref(pid_dword)
+
+    def enum_proc(hwnd, lParam):
+        GetWindowThreadProcessId(hwnd, pid_ref)
+        if pid_dword.value in pids and IsWindowVisible(hwnd):
+            found.append(hwnd)
+        return True
+
+    EnumWindows(WNDENUMPROC(enum_proc), 0)
+    return found
+
+
+def close_process_tree(root_pid: int, timeout: float = 5.0) -> ShutdownResult:
+    """
+    브라우저 창에 WM_CLOSE를 보내 정상 종료를 요청하고 timeout 동안 트리 종료를 기다린 뒤,
+    남은 프로세스만 강제 종료 (프로필이 '비정상 종료' 상태로 남지 않도록)
+    """
+    started = time.monotonic()
     try:
         root = psutil.Process(root_pid)
+        procs = [root] + root.children(recursive=True)
     except psutil.NoSuchProcess:
-        write_log(f"kill_process_tree: PID {root_pid} 프로세스 없음")
-        return
+        return ShutdownResult("none", 0.0, [])
     except Exception as e:
-        write_log(f"kill_process_tree: PID {root_pid} 접근 실패: {e}")
-        return
+        write_log(f"close_process_tree: PID {root_pid} 접근 실패: {e}")
+        return ShutdownResult("none", 0.0, [])
 
-    children = root.children(recursive=True)
-    child_pids = [c.pid for c in children]
+    pids = {p.pid for p in procs}
+    hwnds = windows_of_pids(pids)
+    for hwnd in hwnds:
+        try:
+            user32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+        except Exception as e:
+            write_log(f"close_process_tree: WM_CLOSE 전송 실패 hwnd={hwnd}: {e}")
 
-    for p in children:
+    alive = procs
+    if hwnds:
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+
+    forced = []
+    for p in alive:
         try:
             p.kill()
+            forced.append(p.pid)
+        except psutil.NoSuchProcess:
+            pass
         except Exception as e:
-            write_log(f"kill_process_tree: 자식 PID {p.pid} kill 실패: {e}")
+            write_log(f"close_process_tree: PID {p.pid} kill 실패: {e}")
+    if forced:
+        psutil.wait_procs(alive, timeout=2.0)
 
-    try:
-        root.kill()
-    except Exception as e:
-        write_log(f"kill_process_tree: 루트 PID {root_pid} kill 실패: {e}")
+    result = ShutdownResult("forced" if forced else "graceful", time.monotonic() - started, forced)
+    write_log(
+        f"브라우저 종료: path={result.path}, {result.elapsed:.2f}s, "
+        f"창 {len(hwnds)}개 닫기 요청, 강제 종료 {forced}"
+    )
+    return result
 
+
+# ================== DevTools ==================
+# --remote-debugging-port로 실행한 브라우저의 탭을 HTTP(/json) 엔드포인트로 조작
+# 포트는 고정하지 않음(--remote-debugging-port=0): 브라우저가 프로필 폴더에 남긴 실제 포트를 읽음
+def devtools_active_port(profile_dir: str):
     try:
-        os.system(f"taskkill /F /T /PID {root_pid}")
-    except Exception as e:
-        write_log(f"kill_process_tree: taskkill 실패: {e}")
+        with open(os.path.join(profile_dir, "DevToolsActivePort"), "r", encoding="utf-8") as f:
+            return int(f.readline().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class DevToolsClient:
+    def __init__(self, port: int, timeout: float = 1.0):
+        self.base = f"http://127.0.0.1:{port}"
+        self.timeout = timeout
+        # 시스템 프록시가 localhost 요청을 가로채지 않도록
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def _request(self, path: str, method: str = "GET"):
+        req = urllib.request.Request(self.base + path, method=method)
+        with self._opener.open(req, timeout=self.timeout) as resp:
+            body = resp.read()
+        try:
+            return json.loads(body.decode("utf-8"))
+        except ValueError:
+            return body.decode("utf-8", "replace")
 
-    write_log(f"kill_process_tree: 루트 {root_pid}, 자식 {child_pids} 종료 시도 완료")
+    def pages(self) -> list:
+        return [t for t in self._request("/json/list") if t.get("type") == "page"]
+
+    def open(self, url: str) -> dict:
+        return self._request("/json/new?" + urllib.parse.quote(url, safe=""), method="PUT")
+
+    def activate(self, target_id: str):
+        self._request(f"/json/activate/{target_id}")
+
+    def close(self, target_id: str):
+        self._request(f"/json/close/{target_id}")
+
+    def switch_to(self, url: str):
+        """같은 창에 새 탭으로 url을 열고 기존 탭은 닫음 (브라우저/프로필 유지)"""
+        old = self.pages()
+        target = self.open(url)
+        self.activate(target["id"])
+        for page in old:
+            if page.get("id") != target.get("id"):
+                self.close(page["id"])
 
 
 # ==================  Chrome launch ==================
 # 브라우저 실행 및 모니터링
 class PlayerWorker(QtCore.QObject):
-    status = QtCore.pyqtSignal(str, bool)
     finished = QtCore.pyqtSignal()
 
-    def __init__(self, cfg: dict, stop_event: threading.Event, parent=None):
+    def __init__(self, cfg: dict, stop_event: threading.Event, bus: EventBus, session=None, url: str = "",
+                 parent=None):
         super().__init__(parent)
         self.cfg = cfg
         self.stop_event = stop_event
+        self.bus = bus
+        self.session = session
+        self.url = url
         self.proc = None
+        self.devtools = bool(cfg.get("devtools_switch", False))
+        self._switch_requests = queue.Queue()
+
+    def _publish(self, event_cls, *args):
+        self.bus.publish(event_cls(*args, session=self.session))
 
-    def _emit(self, msg: str, playing: bool):
-        write_log(msg)
-        self.status.emit(msg, playing)
+    def build_command(self, browser_path: str, url: str) -> list:
+        cmd = [
+            browser_path,
+            f"--user-data-dir={PROFILE_DIR}",
+            "--new-window",
+            "--start-maximized",
+            "--autoplay-policy=no-user-gesture-required",
+        ]
+        if self.devtools:
+            cmd.append("--remote-debugging-port=0")
+        cmd.append(url)
+        return cmd
+
+    # GUI 스레드에서 호출: 실행 중인 브라우저에서 다른 URL로 전환 요청
+    def request_switch(self, url: str):
+        self._switch_requests.put(url)
+
+    def _handle_switch_requests(self):
+        url = None
+        while True:
+            try:
+                url = self._switch_requests.get_nowait()
+            except queue.Empty:
+                break
+        if url is None:
+            return
+        if not self.devtools:
+            self._publish(PlaybackError, "switch_failed", "devtools_switch 꺼짐")
+            return
+        # 이번에 띄운 브라우저가 우리 프로필에 남긴 포트만 사용 (다른 브라우저의 탭은 건드리지 않음)
+        port = devtools_active_port(PROFILE_DIR)
+        if port is None:
+            self._publish(PlaybackError, "switch_failed", f"{url} (DevToolsActivePort 없음)")
+            return
+        started = time.monotonic()
+        try:
+            DevToolsClient(port).switch_to(url)
+        except Exception as e:
+            self._publish(PlaybackError, "switch_failed", f"{url} ({e})")
+            return
+        self.url = url
+        self._publish(TrackSwitched, url, time.monotonic() - started)
 
     @QtCore.pyqtSlot()
     def run(self):
         browser_path = self.cfg.get("browser_path", "")
         if not browser_path or not os.path.exists(browser_path):
-            self._emit(f"브라우저 경로 없음: {browser_path}", False)
+            self._publish(PlaybackError, "browser_missing", browser_path)
+            self._publish(Stopped, "browser_missing")
             self.finished.emit()
             return
 
-        url = pick_track_url(self.cfg)
+        url = self.url
         if not url:
-            self._emit("tracks 설정이 비어있습니다(config.json).", False)
+            self._publish(PlaybackError, "no_tracks", "")
+            self._publish(Stopped, "no_tracks")
             self.finished.emit()
             return
 
+        reason = "stop_requested"
         try:
-            self._emit(f"재생 URL: {url}", True)
-
-            cmd = [
-                browser_path,
-                f"--user-data-dir={PROFILE_DIR}",
-                "--new-window",
-                "--start-maximized",
-                "--autoplay-policy=no-user-gesture-required",
-                url,
-            ]
-            self._emit(f"브라우저 실행 명령: {' '.join(cmd)}", True)
+            cmd = self.build_command(browser_path, url)
+            self._publish(LaunchStarted, url, cmd)
 
+            if self.devtools:
+                # 이전 실행이 남긴 포트 파일로 엉뚱한 포트에 붙지 않도록
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, "DevToolsActivePort"))
+                except OSError:
+                    pass
             self.proc = subprocess.Popen(cmd)
-            self._emit(f"브라우저 실행 (PID: {self.proc.pid})", True)
-            self._emit("브라우저 실행 완료, 유튜브 로딩은 GUI에서 모니터링", True)
-
-            while not self.stop_event.is_set():
-                time.sleep(1)
+            self._publish(Launched, self.proc.pid)
 
-            self._emit("재생 루프 종료 요청 수신", False)
+            while not self.stop_event.wait(0.2):
+                self._handle_switch_requests()
 
         except Exception as e:
-            self._emit(f"에러 발생: {e}", False)
+            reason = "error"
+            self._publish(PlaybackError, "exception", str(e))
 
         finally:
+            shutdown = ShutdownResult("none", 0.0, [])
             try:
                 if self.proc and self.proc.poll() is None:
-                    try:
-                        os.system(f"taskkill /F /T /PID {self.proc.pid}")
-                    except Exception as e:
-                        write_log(f"worker 내 taskkill 실패: {e}")
+                    timeout = float(self.cfg.get("shutdown_timeout_sec", 5))
+                    shutdown = close_process_tree(self.proc.pid, timeout)
                 kill_profile_processes(PROFILE_DIR)
-            except Exception:
-                pass
+            except Exception as e:
+                write_log(f"worker 내 브라우저 종료 실패: {e}")
 
+            self._publish(Stopped, reason, shutdown.path, shutdown.elapsed)
             self.finished.emit()
+
+
+# ================== Desktop backend ==================
+# MainWindow가 사용하는 창/프로세스 조작 모음 (리플레이 하네스에서 가짜로 교체)
+class DesktopBackend:
+    TREE_RESCAN_SEC = 5.0
+
+    def __init__(self):
+        self._tree = None
+        self._tree_forced = 0.0
+
+    def find_youtube_window(self, exclude_hwnd=None, root_pid=None):
+        if not root_pid:
+            return find_youtube_window(exclude_hwnd=exclude_hwnd)
+        if self._tree is None or self._tree.root_pid != root_pid:
+            self._tree = ProcessTreePids(root_pid)
+        hwnd, title = find_youtube_window(exclude_hwnd=exclude_hwnd, pids=self._tree.get())
+        # 못 찾았으면 새 자식 프로세스가 생겼을 수 있으니 가끔씩 강제로 다시 수집
+        now = time.monotonic()
+        if not hwnd and now - self._tree_forced >= self.TREE_RESCAN_SEC:
+            self._tree_forced = now
+            before = self._tree.pids
+            if self._tree.get(force=True) != before:
+                hwnd, title = find_youtube_window(exclude_hwnd=exclude_hwnd, pids=self._tree.pids)
+        return hwnd, title
+
+    def get_window_pid(self, hwnd) -> int:
+        return get_window_pid(hwnd)
+
+    def is_window_alive(self, hwnd) -> bool:
+        return is_window_alive(hwnd)
+
+    def send_fullscreen(self, hwnd):
+        send_f_to_window(hwnd)
+
+    def send_reload(self, hwnd):
+        send_reload_to_window(hwnd)
+
+    def close_process_tree(self, root_pid: int, timeout: float = 5.0):
+        return close_process_tree(root_pid, timeout)
+
+    def kill_profile_processes(self):
+        kill_profile_processes(PROFILE_DIR)
+
+    def cpu_sampler(self, root_pid: int):
+        return ProcessTreeCpuSampler(root_pid)
+
+    def create_worker(self, cfg: dict, stop_event: threading.Event, bus: EventBus, session=None, url: str = ""):
+        return PlayerWorker(cfg, stop_event, bus, session, url)
+
+    def create_scanner(self, cfg: dict, exclude_hwnd: int):
+        cpu_interval = float(cfg.get("watchdog", {}).get("cpu_sample_sec", 10))
+        return WindowScanner(self, exclude_hwnd, cpu_interval=cpu_interval)
+
+
+# ================== Status snapshot ==================
+# 장비별 상태를 status.dir/<site>.json에 기록 (fleet.py가 모아서 요약)
+STATUS_VERSION = 1
+
+
+def status_file_name(site: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in site).strip(".")
+    return (safe or "site") + ".json"
+
+
+class StatusWriter:
+    """
+    update()는 GUI 스레드에서 매번 호출해도 됨(최신 값만 보관).
+    파일 기록은 별도 스레드: 내용이 바뀌면 min_interval 이후, 아니면 heartbeat마다.
+    공유 폴더가 느려도 GUI를 막지 않고, tmp 파일 + os.replace로 읽는 쪽은 항상 완성된 파일만 봄.
+    """
+
+    def __init__(self, directory: str, site: str, heartbeat_sec: float = 60.0, min_interval_sec: float = 5.0):
+        self.directory = directory
+        self.site = site
+        self.heartbeat = heartbeat_sec
+        self.min_interval = min_interval_sec
+        self.path = os.path.join(directory, status_file_name(site))
+        self._tmp = os.path.join(directory, "." + status_file_name(site) + ".tmp")
+        self._cond = threading.Condition()
+        self._status = None
+        self._dirty = False
+        self._stopped = False
+        self._thread = None
+        self._failing = False
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        status_cfg = cfg.get("status", {})
+        directory = status_cfg.get("dir") or ""
+        if not directory:
+            return None
+        site = status_cfg.get("site") or socket.gethostname()
+        return cls(
+            os.path.expandvars(directory), site,
+            float(status_cfg.get("heartbeat_sec", 60)), float(status_cfg.get("min_interval_sec", 5)),
+        )
+
+    def load_previous(self) -> dict:
+        """이전 실행이 남긴 스냅샷(없거나 읽을 수 없으면 빈 dict)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="StatusWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def update(self, status: dict):
+        with self._cond:
+            if status != self._status:
+                self._status = status
+                self._dirty = True
+                self._cond.notify()
+
+    def _run(self):
+        last_write = None
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if self._status is not None and last_write is None:
+                        break
+                    if last_write is not None:
+                        due = last_write + (self.min_interval if self._dirty else self.heartbeat)
+                        if now >= due:
+                            break
+                        self._cond.wait(due - now)
+                    else:
+                        self._cond.wait()
+                status = self._status
+                self._dirty = False
+                stopped = self._stopped
+            if status is not None:
+                self._write(status, stopped)
+            last_write = time.monotonic()
+            if stopped:
+                return
+
+    def _write(self, status: dict, stopped: bool):
+        data = dict(status)
+        data.update(
+            version=STATUS_VERSION, site=self.site, host=socket.gethostname(),
+            ts=time.time(), heartbeat_sec=self.heartbeat, stopped=stopped,
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(self._tmp, self.path)
+        except Exception as e:
+            # 공유 폴더가 끊긴 동안 heartbeat마다 로그가 쌓이지 않도록 처음 한 번만
+            if not self._failing:
+                write_log(f"상태 스냅샷 기록 실패({self.path}): {e}")
+            self._failing = True
+            return
+        if self._failing:
+            write_log(f"상태 스냅샷 기록 재개: {self.path}")
+            self._failing = False
+
+
+# ================== Single instance ==================
+# 중복 실행 방지: 이름 있는 뮤텍스로 잠금, 로컬 파이프로 기존 인스턴스에 명령 전달
+INSTANCE_NAME = f"MusicBotTimer_{getpass.getuser()}"
+INSTANCE_COMMANDS = ("show", "start", "stop", "next")
+
+kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+kernel32.CreateMutexW.restype = wintypes.HANDLE
+kernel32.CreateMutexW.argtypes = [ctypes.c_void_p, wintypes.BOOL, wintypes.LPCWSTR]
+ERROR_ALREADY_EXISTS = 183
+
+_instance_mutex = None
+
+
+def acquire_instance_lock(name: str = INSTANCE_NAME) -> bool:
+    """첫 인스턴스면 True (뮤텍스 핸들은 프로세스 종료 시 해제)"""
+    global _instance_mutex
+    handle = kernel32.CreateMutexW(None, False, f"Local\\{name}")
+    if not handle:
+        write_log(f"인스턴스 뮤텍스 생성 실패: {ctypes.get_last_error()}")
+        return True
+    if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+        kernel32.CloseHandle(handle)
+        return False
+    _instance_mutex = handle
+    return True
+
+
+def send_instance_command(command: str, name: str = INSTANCE_NAME, timeout: float = 3.0) -> bool:
+    """실행 중인 인스턴스에 명령 전달 (Qt 없이 파이프 직접 사용, 응답 'ok' 확인)"""
+    pipe_path = f"\\\\.\\pipe\\{name}"
+    result = [False]
+
+    def _send():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with open(pipe_path, "r+b", buffering=0) as pipe:
+                    pipe.write(command.encode("utf-8") + b"\n")
+                    result[0] = pipe.readline().strip() == b"ok"
+                    return
+            except OSError:
+                # 서버가 아직 준비 전이거나 파이프가 바쁜 경우 재시도
+                time.sleep(0.02)
+
+    t = threading.Thread(target=_send, daemon=True)
+    t.start()
+    t.join(timeout + 0.5)
+    return result[0]
+
+
+class InstanceServer(QtCore.QObject):
+    """두 번째 실행에서 보낸 명령(show/start/stop/next)을 받아 GUI 스레드로 전달"""
+    command_received = QtCore.pyqtSignal(str)
+
+    def __init__(self, name: str = INSTANCE_NAME, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+
+    def listen(self) -> bool:
+        if self.server.listen(self.name):
+            return True
+        QtNetwork.QLocalServer.removeServer(self.name)
+        if self.server.listen(self.name):
+            return True
+        write_log(f"인스턴스 서버 시작 실패: {self.server.errorString()}")
+        return False
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(sock.deleteLater)
+
+    def _on_ready_read(self, sock):
+        if not sock.canReadLine():
+            return
+        command = bytes(sock.readLine()).decode("utf-8", "replace").strip()
+        if command not in INSTANCE_COMMANDS:
+            sock.write(b"unknown\n")
+            sock.flush()
+            sock.disconnectFromServer()
+            return
+        sock.write(b"ok\n")
+        sock.flush()
+        sock.disconnectFromServer()
+        write_log(f"다른 실행에서 명령 수신: {command}")
+        QtCore.QTimer.singleShot(0, lambda: self.command_received.emit(command))
@@ -0,0 +1,188 @@
+# diag.py
+
+# GUI 이벤트 루프 진단 도구
+#  - SlowCallDetector: 슬롯/타이머 콜백 실행 시간을 재고 예산 초과 시 스택과 함께 로그
+#  - SamplingProfiler: GUI 스레드 스택을 N초 동안 샘플링해 TEMP_DIR에 기록
+import os
+import sys
+import time
+import datetime
+import threading
+import functools
+import traceback
+import collections
+
+from PyQt5 import QtCore
+
+import core
+
+
+# ================== Slow slot detector ==================
+
+class SlowCallDetector:
+    """GUI 스레드에서 호출되는 함수를 감싸 실행 시간 측정, budget_ms 초과 시 로그"""
+
+    def __init__(self, budget_ms: float = 50.0, stack_limit: int = 25):
+        self.budget = budget_ms / 1000.0
+        self.stack_limit = stack_limit
+        self.gui_thread_id = threading.get_ident()
+        self.slow_calls = 0
+
+        self._active = []  # GUI 스레드 전용 호출 스택 [(name, start, token)]
+        self._token = 0
+        self._sample = None  # (token, stack 문자열)
+        self._busy = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, name="SlowCallWatcher", daemon=True)
+        self._watcher.start()
+
+    def wrap(self, name: str, fn):
+        detector = self
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if threading.get_ident() != detector.gui_thread_id:
+                return fn(*args, **kwargs)
+            detector._enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                detector._exit()
+
+        return wrapper
+
+    def instrument(self, cls, names):
+        for name in names:
+            fn = cls.__dict__.get(name)
+            if fn is None or getattr(fn, "_slow_call_wrapped", False):
+                continue
+            wrapped = self.wrap(f"{cls.__name__}.{name}", fn)
+            wrapped._slow_call_wrapped = True
+            setattr(cls, name, wrapped)
+
+    def _enter(self, name: str):
+        self._token += 1
+        self._active.append((name, time.perf_counter(), self._token))
+        if len(self._active) == 1:
+            self._busy.set()
+
+    def _exit(self):
+        name, start, token = self._active.pop()
+        elapsed = time.perf_counter() - start
+        if not self._active:
+            self._busy.clear()
+        if elapsed < self.budget:
+            return
+
+        self.slow_calls += 1
+        chain = " > ".join([n for n, _, _ in self._active] + [name])
+        core.write_log(f"[slow] {chain}: {elapsed * 1000:.1f}ms (예산 {self.budget * 1000:.0f}ms)")
+        sample = self._sample
+        if sample and sample[0] == token:
+            core.write_log(f"[slow] {self.budget * 1000:.0f}ms 시점 스택:\n{sample[1]}")
+            self._sample = None
+
+    def _watch(self):
+        # 가장 바깥 호출이 예산을 넘기는 순간 GUI 스레드 스택을 한 번 채집
+        while True:
+            self._busy.wait()
+            try:
+                name, start, token = self._active[0]
+            except IndexError:
+                continue
+            remaining = start + self.budget - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            if not self._active or self._active[0][2] != token:
+                time.sleep(0.001)
+                continue
+            frame = sys._current_frames().get(self.gui_thread_id)
+            if frame is not None:
+                stack = "".join(traceback.format_stack(frame, limit=self.stack_limit))
+                self._sample = (token, stack.rstrip())
+            # 같은 호출이 끝날 때까지 다시 채집하지 않음
+            while self._active and self._active[0][2] == token:
+                time.sleep(0.005)
+
+
+# ================== Sampling profiler ==================
+
+class SamplingProfiler(QtCore.QObject):
+    """GUI 스레드 스택을 주기적으로 채집해 folded stack 형식으로 저장"""
+    finished = QtCore.pyqtSignal(str)
+
+    def __init__(self, seconds: float = 30.0, interval_ms: float = 5.0, parent=None):
+        super().__init__(parent)
+        self.seconds = seconds
+        self.interval = interval_ms / 1000.0
+        self.thread_id = threading.get_ident()
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if self.is_running():
+            return False
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        stacks = collections.Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + self.seconds
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stacks[self._fold(frame)] += 1
+                samples += 1
+            time.sleep(self.interval)
+
+        path = os.path.join(
+            core.TEMP_DIR,
+            f"MusicBot_Profile_{datetime.datetime.now():%Y%m%d_%H%M%S}.txt",
+        )
+        try:
+            self._write(path, stacks, samples, time.perf_counter() - started)
+            core.write_log(f"프로파일 기록 완료: {path} (샘플 {samples}개)")
+        except Exception as e:
+            core.write_log(f"프로파일 기록 실패: {e}")
+            path = ""
+        self.finished.emit(path)
+
+    @staticmethod
+    def _fold(frame) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _write(self, path: str, stacks: collections.Counter, samples: int, elapsed: float):
+        # 최상위 프레임 기준 요약 + flamegraph 도구용 folded stack
+        leaf = collections.Counter()
+        for stack, count in stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# GUI thread sampling profile: {elapsed:.1f}s, interval {self.interval * 1000:.1f}ms, samples {samples}\n")
+            f.write("# top frames (self)\n")
+            for frame, count in leaf.most_common(30):
+                f.write(f"#   {count * 100.0 / max(samples, 1):5.1f}%  {frame}\n")
+            f.write("# folded stacks\n")
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# 설정에 따라 느린 슬롯 감지 설치 (MainWindow 생성 전에 호출)
+def install(cfg: dict, classes):
+    diag_cfg = cfg.get("diagnostics", {})
+    if not diag_cfg.get("slot_timing", False):
+        return None
+    detector = SlowCallDetector(float(diag_cfg.get("slot_budget_ms", 50)))
+    for cls in classes:
+        detector.instrument(cls, getattr(cls, "INSTRUMENTED_SLOTS", ("paintEvent",)))
+    core.write_log(f"슬롯 시간 측정 활성화 (예산 {detector.budget * 1000:.0f}ms)")
+    return detector
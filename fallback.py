@@ -0,0 +1,335 @@
+# fallback.py
+
+# 브라우저 재생이 안 될 때 로컬 오디오 캐시로 대신 재생
+#  - AudioCache: 캐시 폴더 관리 (원본 폴더 동기화, 용량 제한, 오래 안 튼 파일부터 삭제)
+#  - FallbackPlayer: QtMultimedia로 캐시 파일을 이어서 재생 (별도 프로세스 없음)
+#
+#   python fallback.py list
+#   python fallback.py sync D:\music
+#   python fallback.py play --seconds 30
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import threading
+
+from PyQt5 import QtCore
+
+import core
+
+try:
+    from PyQt5 import QtMultimedia
+except ImportError:  # QtMultimedia가 빠진 PyQt5 배포판
+    QtMultimedia = None
+
+
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".aac", ".wav", ".ogg", ".flac", ".wma", ".opus")
+INDEX_FILE = "index.json"
+DEFAULT_CACHE_DIR = os.path.join(core.TEMP_DIR, "MusicBotAudioCache")
+
+
+# ================== Audio cache ==================
+
+class AudioCache:
+    """캐시 폴더의 오디오 파일 + 파일별 마지막 재생 시각(index.json)"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._played = self._load_index()
+        self._sync_thread = None
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        fb = cfg.get("fallback", {})
+        directory = os.path.expandvars(fb.get("cache_dir") or DEFAULT_CACHE_DIR)
+        return cls(directory, int(float(fb.get("max_cache_mb", 2048)) * 1024 * 1024))
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return {k: float(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            core.write_log(f"오디오 캐시 목록 읽기 실패: {e}")
+            return {}
+
+    def _save_index(self):
+        # self._lock 안에서 호출
+        tmp = self._index_path() + ".tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._played, f, ensure_ascii=False)
+            os.replace(tmp, self._index_path())
+        except Exception as e:
+            core.write_log(f"오디오 캐시 목록 저장 실패: {e}")
+
+    def files(self) -> list:
+        """[(이름, 크기, 수정 시각)] — 복사 중인 .part 파일은 제외"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    st = entry.stat()
+                    found.append((entry.name, st.st_size, st.st_mtime))
+        return found
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.files())
+
+    def last_played(self, name: str) -> float:
+        return self._played.get(name, 0.0)
+
+    def next_track(self, exclude: str = None):
+        """가장 오래 안 튼 쪽(앞쪽 1/3)에서 무작위로 하나, 없으면 None"""
+        names = [name for name, _, _ in self.files()]
+        if exclude and len(names) > 1:
+            names = [n for n in names if os.path.join(self.directory, n) != exclude]
+        if not names:
+            return None
+        names.sort(key=self.last_played)
+        choice = random.choice(names[:max(1, len(names) // 3)])
+        return os.path.join(self.directory, choice)
+
+    def mark_played(self, path: str):
+        with self._lock:
+            self._played[os.path.basename(path)] = time.time()
+            self._save_index()
+
+    def add(self, src: str) -> str:
+        """src를 캐시에 복사 (.part로 복사 후 이름 변경, 재생 쪽은 완성된 파일만 봄)"""
+        os.makedirs(self.directory, exist_ok=True)
+        dest = os.path.join(self.directory, os.path.basename(src))
+        part = dest + ".part"
+        shutil.copyfile(src, part)
+        os.replace(part, dest)
+        return dest
+
+    def sync(self, source_dir: str, keep: str = None):
+        """
+        source_dir(하위 폴더 포함)에서 없거나 크기가 다른 파일만 복사 후 용량 정리. (추가, 삭제) 목록
+        용량을 넘게 되는 파일은 복사하지 않음 (매번 지웠다 다시 받는 반복 방지)
+        """
+        have = {name: size for name, size, _ in self.files()}
+        total = sum(have.values())
+        added = []
+        for root, _, names in os.walk(source_dir):
+            for name in names:
+                if not name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                src = os.path.join(root, name)
+                try:
+                    size = os.path.getsize(src)
+                    if have.get(name) == size or total - have.get(name, 0) + size > self.max_bytes:
+                        continue
+                    self.add(src)
+                except OSError as e:
+                    core.write_log(f"오디오 캐시 복사 실패: {src} ({e})")
+                    continue
+                total += size - have.get(name, 0)
+                have[name] = size
+                added.append(name)
+        return added, self.prune(keep)
+
+    def sync_in_background(self, source_dir: str, keep=None):
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+        self._sync_thread = threading.Thread(
+            target=self._sync_logged, args=(source_dir, keep), name="AudioCacheSync", daemon=True,
+        )
+        self._sync_thread.start()
+
+    def _sync_logged(self, source_dir: str, keep):
+        try:
+            added, evicted = self.sync(source_dir, keep() if callable(keep) else keep)
+            core.write_log(f"오디오 캐시 동기화: 추가 {len(added)}개, 삭제 {len(evicted)}개 ({source_dir})")
+        except Exception as e:
+            core.write_log(f"오디오 캐시 동기화 실패: {e}")
+
+    def prune(self, keep: str = None) -> list:
+        """max_bytes를 넘으면 오래 안 튼 파일부터 삭제 (keep=재생 중인 파일은 제외)"""
+        files = self.files()
+        total = sum(size for _, size, _ in files)
+        evicted = []
+        files.sort(key=lambda f: (self.last_played(f[0]), f[2]))
+        for name, size, _ in files:
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.directory, name)
+            if keep and path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                core.write_log(f"오디오 캐시 삭제 실패: {name} ({e})")
+                continue
+            total -= size
+            evicted.append(name)
+        with self._lock:
+            present = {name for name, _, _ in self.files()}
+            stale = [name for name in self._played if name not in present]
+            for name in stale:
+                del self._played[name]
+            if stale or evicted:
+                self._save_index()
+        return evicted
+
+
+# ================== Fallback player ==================
+
+class FallbackPlayer(QtCore.QObject):
+    """캐시 파일을 끝날 때마다 다음 곡으로 이어서 재생 (GUI 스레드에서 사용)"""
+
+    def __init__(self, cache: AudioCache, volume: int = 80, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.active = False
+        self.reason = ""
+        self.current = None
+        self._errors = 0
+        self._player = None
+        if QtMultimedia is not None:
+            self._player = QtMultimedia.QMediaPlayer(self)
+            self._player.setVolume(volume)
+            self._player.mediaStatusChanged.connect(self._on_media_status)
+            self._player.error.connect(self._on_error)
+
+    @classmethod
+    def from_config(cls, cfg: dict, parent=None):
+        fb = cfg.get("fallback", {})
+        if not fb.get("enabled", True):
+            return None
+        player = cls(AudioCache.from_config(cfg), int(fb.get("volume", 80)), parent)
+        if player._player is None:
+            core.write_log("대체 재생 사용 불가: PyQt5 QtMultimedia 없음")
+        source_dir = fb.get("source_dir") or ""
+        if source_dir:
+            player.cache.sync_in_background(os.path.expandvars(source_dir), keep=lambda: player.current)
+        return player
+
+    @property
+    def available(self) -> bool:
+        return self._player is not None
+
+    def start(self, reason: str) -> bool:
+        if self.active:
+            return True
+        if not self.available:
+            return False
+        self._errors = 0
+        if not self._play_next():
+            core.write_log(f"대체 재생 불가: 오디오 캐시가 비어 있음 ({self.cache.directory})")
+            return False
+        self.active = True
+        self.reason = reason
+        core.write_log(f"대체 재생 시작 (reason={reason}): {os.path.basename(self.current)}")
+        return True
+
+    def stop(self, reason: str):
+        if not self.active:
+            return
+        self.active = False
+        self._player.stop()
+        self._player.setMedia(QtMultimedia.QMediaContent())
+        core.write_log(f"대체 재생 중지 ({reason})")
+
+    def _play_next(self) -> bool:
+        path = self.cache.next_track(exclude=self.current)
+        if not path:
+            return False
+        self.current = path
+        self.cache.mark_played(path)
+        self._player.setMedia(QtMultimedia.QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+        self._player.play()
+        return True
+
+    def _on_media_status(self, status):
+        if not self.active:
+            return
+        if status == QtMultimedia.QMediaPlayer.EndOfMedia:
+            self._errors = 0
+            self._play_next()
+        elif status == QtMultimedia.QMediaPlayer.InvalidMedia:
+            self._skip_broken(f"재생할 수 없는 파일: {self.current}")
+
+    def _on_error(self, error):
+        if self.active and error != QtMultimedia.QMediaPlayer.NoError:
+            self._skip_broken(f"{self._player.errorString()} ({self.current})")
+
+    def _skip_broken(self, detail: str):
+        # 캐시 전체가 재생 불가면 무한 반복하지 않고 중지
+        self._errors += 1
+        core.write_log(f"대체 재생 오류: {detail}")
+        if self._errors > len(self.cache.files()) or not self._play_next():
+            self.stop("재생 가능한 파일 없음")
+
+
+# ================== CLI ==================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대체 재생용 오디오 캐시 관리")
+    parser.add_argument("--config", default=os.path.join(core.BASE_DIR, "config.json"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="캐시 파일과 마지막 재생 시각")
+    add = sub.add_parser("add", help="파일을 캐시에 복사")
+    add.add_argument("files", nargs="+")
+    sync = sub.add_parser("sync", help="원본 폴더와 동기화 (기본: fallback.source_dir)")
+    sync.add_argument("source", nargs="?")
+    sub.add_parser("prune", help="용량 제한에 맞춰 오래 안 튼 파일 삭제")
+    play = sub.add_parser("play", help="캐시에서 n초 동안 재생 (소리 확인용)")
+    play.add_argument("--seconds", type=float, default=30)
+    args = parser.parse_args(argv)
+
+    cfg = core.load_config(args.config)
+    cache = AudioCache.from_config(cfg)
+
+    if args.command == "list":
+        files = sorted(cache.files(), key=lambda f: cache.last_played(f[0]), reverse=True)
+        for name, size, _ in files:
+            played = cache.last_played(name)
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(played)) if played else "-"
+            print(f"  {size / 1048576:8.1f}MB  {when:<16}  {name}")
+        print(f"{len(files)}개, {cache.total_bytes() / 1048576:.1f}MB / {cache.max_bytes / 1048576:.0f}MB ({cache.directory})")
+    elif args.command == "add":
+        for path in args.files:
+            print(f"추가: {cache.add(path)}")
+        for name in cache.prune():
+            print(f"삭제: {name}")
+    elif args.command == "sync":
+        source = args.source or cfg.get("fallback", {}).get("source_dir")
+        if not source or not os.path.isdir(source):
+            print(f"원본 폴더가 없습니다: {source}")
+            return 1
+        added, evicted = cache.sync(os.path.expandvars(source))
+        print(f"추가 {len(added)}개, 삭제 {len(evicted)}개")
+    elif args.command == "prune":
+        for name in cache.prune():
+            print(f"삭제: {name}")
+    elif args.command == "play":
+        app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv)
+        player = FallbackPlayer(cache, int(cfg.get("fallback", {}).get("volume", 80)))
+        if not player.available:
+            print("PyQt5 QtMultimedia가 없어 재생할 수 없습니다.")
+            return 1
+        if not player.start("manual"):
+            print(f"캐시가 비어 있습니다: {cache.directory}")
+            return 1
+        QtCore.QTimer.singleShot(int(args.seconds * 1000), app.quit)
+        app.exec_()
+        player.stop("manual")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
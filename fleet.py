@@ -0,0 +1,204 @@
+# fleet.py
+
+# 여러 장비의 상태 스냅샷(config.json status.dir/<site>.json) 요약
+# 폴더를 다시 볼 때는 크기/수정 시각이 바뀐 파일만 다시 읽는다.
+#
+#   python fleet.py \\server\musicbot\status
+#   python fleet.py \\server\musicbot\status --watch 30
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+
+
+STATE_PLAYING = "playing"
+STATE_MISSED = "missed"
+STATE_STALE = "stale"
+STATE_OFFLINE = "offline"
+STATE_IDLE = "idle"
+
+STATE_TEXT = {
+    STATE_PLAYING: "재생 중",
+    STATE_MISSED: "오늘 시작 누락",
+    STATE_STALE: "응답 없음",
+    STATE_OFFLINE: "프로그램 종료됨",
+    STATE_IDLE: "대기",
+}
+
+
+# ================== Snapshot index ==================
+
+class FleetIndex:
+    """status 폴더의 <site>.json 캐시. refresh()는 바뀐 파일만 다시 읽음"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.sites = {}  # 파일명 -> ((mtime_ns, size), data)
+        self.reads = 0
+
+    def refresh(self) -> int:
+        """바뀐(추가/수정/삭제) 파일 수"""
+        changed = 0
+        seen = set()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                # 기록 중인 임시 파일(.<site>.json.tmp)은 건너뜀
+                if entry.name.startswith(".") or not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                seen.add(entry.name)
+                key = (st.st_mtime_ns, st.st_size)
+                cached = self.sites.get(entry.name)
+                if cached is not None and cached[0] == key:
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue  # 다음 refresh에서 다시 시도, 그동안은 이전 값 유지
+                self.sites[entry.name] = (key, data)
+                self.reads += 1
+                changed += 1
+        for name in set(self.sites) - seen:
+            del self.sites[name]
+            changed += 1
+        return changed
+
+    def snapshots(self) -> list:
+        return [data for _, data in self.sites.values()]
+
+
+# ================== Classification ==================
+
+def _add_minutes(hhmm: str, minutes: int) -> str:
+    h, m = hhmm.split(":")
+    total = int(h) * 60 + int(m) + minutes
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def site_state(data: dict, now: float, stale_sec: float = None, grace_min: int = 5) -> dict:
+    """
+    스냅샷 하나 판정. 시각 비교는 그 장비의 로컬 시각(local_time) 기준.
+    stale_sec 없으면 장비 heartbeat의 3배.
+    """
+    heartbeat = float(data.get("heartbeat_sec", 60))
+    age = now - float(data.get("ts", 0))
+    local_time = data.get("local_time") or ""
+    local_date, _, local_hm = local_time.partition(" ")
+    last_error = data.get("last_error") or None
+    error_today = bool(last_error and local_date and str(last_error.get("at", "")).startswith(local_date))
+
+    if data.get("stopped"):
+        state = STATE_OFFLINE
+    elif age > (stale_sec if stale_sec is not None else heartbeat * 3):
+        state = STATE_STALE
+    elif data.get("is_playing"):
+        state = STATE_PLAYING
+    elif (
+        data.get("mode", "auto") == "auto"
+        and local_hm
+        and local_hm >= _add_minutes(data.get("start_time", "00:00"), grace_min)
+        and data.get("last_play_date") != local_date
+    ):
+        state = STATE_MISSED
+    else:
+        state = STATE_IDLE
+
+    return {
+        "site": data.get("site") or "?",
+        "state": state,
+        "age_sec": age,
+        "local_time": local_time,
+        "track": data.get("current_track_title") or "",
+        "fallback": bool(data.get("fallback")),
+        "next_start": data.get("next_start") or "",
+        "error": last_error if error_today else None,
+    }
+
+
+def summarize(snapshots, now: float, stale_sec: float = None, grace_min: int = 5) -> dict:
+    rows = sorted((site_state(d, now, stale_sec, grace_min) for d in snapshots), key=lambda r: r["site"])
+    counts = {state: 0 for state in STATE_TEXT}
+    for row in rows:
+        counts[row["state"]] += 1
+    return {"counts": counts, "rows": rows}
+
+
+# ================== Report ==================
+
+def _fmt_age(sec: float) -> str:
+    if sec < 120:
+        return f"{sec:.0f}초 전"
+    if sec < 7200:
+        return f"{sec / 60:.0f}분 전"
+    return f"{sec / 3600:.1f}시간 전"
+
+
+def print_summary(summary: dict, show_all: bool = False):
+    rows = summary["rows"]
+    print(f"[{datetime.datetime.now():%Y-%m-%d %H:%M:%S}] 장비 {len(rows)}대 · "
+          + ", ".join(f"{STATE_TEXT[s]} {n}" for s, n in summary["counts"].items() if n))
+
+    for state in (STATE_MISSED, STATE_STALE, STATE_OFFLINE):
+        bad = [r for r in rows if r["state"] == state]
+        if bad:
+            print(f"{STATE_TEXT[state]}:")
+            for r in bad:
+                print(f"  {r['site']:<24} 마지막 보고 {_fmt_age(r['age_sec']):<10} 현지 {r['local_time']}")
+
+    errors = [r for r in rows if r["error"]]
+    if errors:
+        print("오늘 오류:")
+        for r in errors:
+            print(f"  {r['site']:<24} {r['error'].get('at', '')}  {r['error'].get('message', '')}")
+
+    if show_all:
+        print("전체:")
+        for r in rows:
+            detail = r["track"] if r["state"] == STATE_PLAYING else f"다음 시작 {r['next_start']}"
+            if r["fallback"]:
+                detail = "(로컬 음원 대체 재생) " + detail
+            print(f"  {r['site']:<24} {STATE_TEXT[r['state']]:<10} {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장비별 상태 스냅샷 요약")
+    parser.add_argument("directory", help="config.json status.dir과 같은 폴더")
+    parser.add_argument("--watch", type=float, default=0, help="n초마다 다시 확인 (바뀐 파일만 읽음)")
+    parser.add_argument("--stale", type=float, default=None, help="응답 없음 기준(초), 기본: 장비 heartbeat의 3배")
+    parser.add_argument("--grace", type=int, default=5, help="시작 시각 후 누락으로 볼 때까지 여유(분)")
+    parser.add_argument("--all", action="store_true", help="모든 장비 표시")
+    parser.add_argument("--json", action="store_true", help="요약을 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"폴더가 없습니다: {args.directory}")
+        return 1
+
+    index = FleetIndex(args.directory)
+    last_states = None
+    while True:
+        changed = index.refresh()
+        summary = summarize(index.snapshots(), time.time(), args.stale, args.grace)
+        # 파일이 그대로여도 시간이 지나 응답 없음/누락으로 바뀔 수 있으므로 상태도 비교
+        states = [(r["site"], r["state"]) for r in summary["rows"]]
+        if changed or states != last_states:
+            if args.json:
+                json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+                print()
+            else:
+                print_summary(summary, args.all)
+                print()
+        last_states = states
+        if not args.watch:
+            return 0 if not (summary["counts"][STATE_MISSED] or summary["counts"][STATE_STALE]) else 2
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# logstats.py
+
+# MusicBot_Debug.txt 분석
+# 로그를 한 줄씩 흘려 읽으며(메모리 일정) 실행→창 감지→곡 인식→종료를 세션 단위로 묶고
+# 시작 지연 백분위, 실패 횟수, 날짜별 재생 시간/곡 수를 출력한다.
+# --state를 주면 마지막으로 처리한 바이트 위치와 집계를 저장해 다음 실행은 이어서 읽는다.
+#
+#   python logstats.py --state %TEMP%\MusicBot_LogStats.json
+import os
+import re
+import sys
+import json
+import argparse
+import datetime
+import collections
+
+
+# core.LOG_FILE과 같은 위치 (분석만 하는 PC에는 PyQt5/psutil이 없을 수 있어 core를 import하지 않음)
+DEFAULT_LOG = os.path.join(os.getenv("TEMP") or os.getcwd(), "MusicBot_Debug.txt")
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+STATE_VERSION = 1
+
+# 메시지 앞부분으로 분류 (bytes 정규식 하나로 대부분의 줄은 디코딩 없이 건너뜀)
+MATCHERS = (
+    ("launch", r"재생 URL: "),
+    ("pid", r"브라우저 실행 \(PID: "),
+    ("window", r"YouTube 창 핸들 감지: "),
+    ("track", r"현재 곡 인식/갱신: "),
+    ("stopping", r"stop_playback 호출: "),
+    ("stopped", r"재생 종료 \(reason="),
+    # 이전 형식 로그: 재생 종료 기록 대신 루프 종료/스레드 종료로 세션 끝
+    ("loop_end", r"재생 루프 종료 요청 수신|플레이어 스레드 종료"),
+    ("gui_start", r"=+ YouTube Music Timer GUI 시작"),
+    ("browser_missing", r"브라우저 경로 없음: "),
+    ("no_tracks", r"tracks 설정이 비어있습니다"),
+    ("error", r"에러 발생: "),
+    ("kill_failed", r"close_process_tree: PID \d+ kill 실패|  종료 실패 PID=|worker 내 브라우저 종료 실패"
+                    r"|kill_process_tree: .*kill 실패|kill_process_tree: taskkill 실패|worker 내 taskkill 실패"),
+    ("key_failed", r"F5?키 전송 실패"),
+    ("switch_failed", r"URL 전환 실패: "),
+    ("stall", r"워치독: 재생 정지 감지 \(reason="),
+    ("recovered", r"워치독 복구 완료: "),
+    ("gave_up", r"워치독 복구 포기: "),
+)
+LINE_RE = re.compile(
+    (r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (?:"
+     + "|".join(f"(?P<{name}>{pattern})" for name, pattern in MATCHERS)
+     + ")").encode("utf-8")
+)
+STOPPED_RE = re.compile(r"reason=([^,]+), shutdown=([^,]+), ([\d.]+)s")
+STALL_RE = re.compile(r"reason=(\w+)")
+TTR_RE = re.compile(r"ttr=([\d.]+)s")
+
+FAILURE_KINDS = ("browser_missing", "no_tracks", "error", "kill_failed", "key_failed", "switch_failed")
+
+
+# ================== Aggregation ==================
+
+class LogStats:
+    """세션 묶기 + 집계. to_dict/from_dict로 증분 실행 사이에 저장"""
+
+    def __init__(self):
+        self.offset = 0
+        self.signature = ""
+        self.lines = 0
+        self.sessions = 0
+        self.orphans = 0  # 종료 기록 없이 끝난 세션 (강제 종료/크래시)
+        # 지연은 0.1초 단위 히스토그램 (세션 수와 무관하게 크기 제한)
+        self.title_latency = collections.Counter()
+        self.window_latency = collections.Counter()
+        self.failures = collections.Counter()
+        self.stop_reasons = collections.Counter()
+        self.shutdown_paths = collections.Counter()
+        self.stalls = collections.Counter()
+        self.recovery_ttr = collections.Counter()
+        self.day_uptime = collections.Counter()
+        self.day_tracks = collections.Counter()
+        self.day_sessions = collections.Counter()
+        self.current = None  # 진행 중 세션 {"start", "last", "window", "title", "stop"}
+
+    # ---------- Session pairing ----------
+
+    def _open(self, ts: datetime.datetime):
+        if self.current is not None:
+            self.orphans += 1
+            self._close(self.current["last"])
+        self.current = {"start": ts, "last": ts, "window": None, "title": None, "stop": None}
+        self.sessions += 1
+        self.day_sessions[ts.date().isoformat()] += 1
+
+    def _close(self, ts: datetime.datetime):
+        cur = self.current
+        self.current = None
+        start = cur["start"]
+        # 날짜별 재생 시간은 자정에서 나눠 집계
+        while start < ts:
+            midnight = datetime.datetime.combine(start.date() + datetime.timedelta(days=1), datetime.time())
+            part_end = min(ts, midnight)
+            self.day_uptime[start.date().isoformat()] += (part_end - start).total_seconds()
+            start = part_end
+
+    def feed(self, kind: str, ts: datetime.datetime, msg: str):
+        cur = self.current
+        if kind == "launch":
+            self._open(ts)
+        elif kind == "gui_start":
+            if cur is not None:
+                self.orphans += 1
+                self._close(cur["last"])
+        elif kind == "window":
+            if cur is not None and cur["window"] is None:
+                cur["window"] = ts
+                self.window_latency[_bucket(ts - cur["start"])] += 1
+        elif kind == "track":
+            self.day_tracks[ts.date().isoformat()] += 1
+            if cur is not None and cur["title"] is None:
+                cur["title"] = ts
+                self.title_latency[_bucket(ts - cur["start"])] += 1
+        elif kind == "stopping":
+            if cur is not None:
+                cur["stop"] = msg.split(": ", 1)[-1].strip()
+        elif kind == "stopped":
+            m = STOPPED_RE.search(msg)
+            if m:
+                self.shutdown_paths[m.group(2)] += 1
+            if cur is not None:
+                self.stop_reasons[cur["stop"] or (m.group(1) if m else "unknown")] += 1
+                self._close(ts)
+        elif kind == "loop_end":
+            if cur is not None:
+                self.stop_reasons[cur["stop"] or "unknown"] += 1
+                self._close(ts)
+        elif kind == "stall":
+            m = STALL_RE.search(msg)
+            self.stalls[m.group(1) if m else "unknown"] += 1
+        elif kind == "recovered":
+            m = TTR_RE.search(msg)
+            if m:
+                self.recovery_ttr[_bucket(datetime.timedelta(seconds=float(m.group(1))))] += 1
+        elif kind == "gave_up":
+            self.stalls["gave_up"] += 1
+        elif kind in FAILURE_KINDS:
+            self.failures[kind] += 1
+
+        # 이전 세션이 종료 기록 없이 끝났으면 그 세션의 마지막 줄에서 닫도록 처리 후에 갱신
+        if self.current is not None:
+            self.current["last"] = ts
+
+    # ---------- Persistence ----------
+
+    def to_dict(self) -> dict:
+        cur = None
+        if self.current is not None:
+            cur = {k: (v.strftime(TS_FORMAT) if isinstance(v, datetime.datetime) else v)
+                   for k, v in self.current.items()}
+        return {
+            "version": STATE_VERSION,
+            "offset": self.offset,
+            "signature": self.signature,
+            "lines": self.lines,
+            "sessions": self.sessions,
+            "orphans": self.orphans,
+            "title_latency": self.title_latency,
+            "window_latency": self.window_latency,
+            "failures": self.failures,
+            "stop_reasons": self.stop_reasons,
+            "shutdown_paths": self.shutdown_paths,
+            "stalls": self.stalls,
+            "recovery_ttr": self.recovery_ttr,
+            "day_uptime": self.day_uptime,
+            "day_tracks": self.day_tracks,
+            "day_sessions": self.day_sessions,
+            "current": cur,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogStats":
+        stats = cls()
+        if data.get("version") != STATE_VERSION:
+            return stats
+        stats.offset = int(data.get("offset", 0))
+        stats.signature = data.get("signature", "")
+        stats.lines = int(data.get("lines", 0))
+        stats.sessions = int(data.get("sessions", 0))
+        stats.orphans = int(data.get("orphans", 0))
+        for name in ("title_latency", "window_latency", "recovery_ttr"):
+            setattr(stats, name, collections.Counter({int(k): v for k, v in data.get(name, {}).items()}))
+        for name in ("failures", "stop_reasons", "shutdown_paths", "stalls",
+                     "day_uptime", "day_tracks", "day_sessions"):
+            setattr(stats, name, collections.Counter(data.get(name, {})))
+        cur = data.get("current")
+        if cur:
+            stats.current = {k: (datetime.datetime.strptime(v, TS_FORMAT) if k != "stop" and v else v)
+                             for k, v in cur.items()}
+        return stats
+
+
+def _bucket(delta: datetime.timedelta) -> int:
+    return int(round(delta.total_seconds() * 10))
+
+
+def percentile(hist: collections.Counter, pct: float):
+    """0.1초 히스토그램의 백분위(초), 비어 있으면 None"""
+    total = sum(hist.values())
+    if not total:
+        return None
+    rank = max(int(-(-pct * total // 100)), 1)
+    seen = 0
+    for bucket in sorted(hist):
+        seen += hist[bucket]
+        if seen >= rank:
+            return bucket / 10.0
+    return max(hist) / 10.0
+
+
+# ================== Streaming ==================
+
+def _signature(path: str) -> str:
+    # 로그가 새 파일로 바뀌었는지 확인용 (첫 줄)
+    with open(path, "rb") as f:
+        return f.readline(256).hex()
+
+
+def scan(path: str, stats: LogStats) -> LogStats:
+    """stats.offset부터 끝까지 완성된 줄만 처리하고 offset 갱신"""
+    size = os.path.getsize(path)
+    signature = _signature(path)
+    if size < stats.offset or (stats.signature and signature != stats.signature):
+        print(f"로그 파일이 바뀌어 처음부터 다시 읽습니다: {path}")
+        stats = LogStats()
+    stats.signature = signature
+
+    match = LINE_RE.match
+    offset = stats.offset
+    lines = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # 기록 중인 마지막 줄은 다음 실행에서
+            offset += len(raw)
+            lines += 1
+            m = match(raw)
+            if m is None:
+                continue
+            ts = datetime.datetime.strptime(m.group(1).decode("ascii"), TS_FORMAT)
+            stats.feed(m.lastgroup, ts, raw[m.start(m.lastgroup):].decode("utf-8", "replace").rstrip())
+    stats.offset = offset
+    stats.lines += lines
+    return stats
+
+
+def load_state(path: str) -> LogStats:
+    if not path or not os.path.exists(path):
+        return LogStats()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return LogStats.from_dict(json.load(f))
+    except Exception as e:
+        print(f"상태 파일을 읽을 수 없어 처음부터 분석합니다: {e}")
+        return LogStats()
+
+
+def save_state(path: str, stats: LogStats):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stats.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ================== Report ==================
+
+def _fmt_sec(value) -> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+
+def print_report(stats: LogStats, days: int = 14):
+    print(f"처리한 줄: {stats.lines}  (오프셋 {stats.offset})")
+    print(f"세션: {stats.sessions}회, 종료 기록 없음 {stats.orphans}회"
+          + (" (진행 중 1회)" if stats.current else ""))
+    print()
+    for label, hist in (("곡 제목 인식", stats.title_latency), ("창 감지", stats.window_latency)):
+        n = sum(hist.values())
+        print(f"시작 지연({label}, n={n}): "
+              + "  ".join(f"p{p} {_fmt_sec(percentile(hist, p))}" for p in (50, 90, 99))
+              + f"  최대 {_fmt_sec(max(hist) / 10.0 if hist else None)}")
+    print()
+    print("실패: " + (", ".join(f"{k} {v}" for k, v in sorted(stats.failures.items())) or "없음"))
+    print("정지 사유: " + (", ".join(f"{k} {v}" for k, v in stats.stop_reasons.most_common()) or "없음"))
+    print("브라우저 종료 경로: " + (", ".join(f"{k} {v}" for k, v in stats.shutdown_paths.most_common()) or "없음"))
+    if stats.stalls:
+        print("워치독 정지 감지: " + ", ".join(f"{k} {v}" for k, v in stats.stalls.most_common())
+              + f"  (복구 p50 {_fmt_sec(percentile(stats.recovery_ttr, 50))}, "
+              f"p90 {_fmt_sec(percentile(stats.recovery_ttr, 90))})")
+    print()
+    all_days = sorted(set(stats.day_uptime) | set(stats.day_tracks) | set(stats.day_sessions))
+    shown = all_days[-days:] if days else all_days
+    print(f"날짜별 (최근 {len(shown)}일 / 전체 {len(all_days)}일):")
+    for day in shown:
+        m, s = divmod(int(stats.day_uptime.get(day, 0)), 60)
+        h, m = divmod(m, 60)
+        print(f"  {day}  재생 {h:d}:{m:02d}:{s:02d}  세션 {stats.day_sessions.get(day, 0):>3}  "
+              f"곡 {stats.day_tracks.get(day, 0):>4}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MusicBot 디버그 로그 분석")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG)
+    parser.add_argument("--state", default=None, help="증분 분석 상태 파일 (마지막 바이트 위치와 집계 저장)")
+    parser.add_argument("--reset", action="store_true", help="상태 파일을 무시하고 처음부터 분석")
+    parser.add_argument("--days", type=int, default=14, help="날짜별 표에 보여줄 일수 (0=전체)")
+    parser.add_argument("--json", action="store_true", help="집계를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.log):
+        print(f"로그 파일이 없습니다: {args.log}")
+        return 1
+
+    stats = LogStats() if args.reset else load_state(args.state)
+    stats = scan(args.log, stats)
+    if args.state:
+        save_state(args.state, stats)
+
+    if args.json:
+        json.dump(stats.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(stats, args.days)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,510 @@
+# replay.py
+
+# 가상 시계 리플레이 하네스
+# 실제 QTimer/브라우저 대신 가짜 시계와 가짜 창/프로세스 백엔드로
+# MainWindow의 스케줄 로직을 며칠~몇 주 분량만큼 빠르게 돌려본다.
+#
+#   python replay.py --start 2026-03-07T00:00 --days 14 --tz America/New_York
+#   python replay.py --days 1 --next-every 30 --no-devtools   (URL 전환 실패 → 재실행 경로)
+import os
+import sys
+import time
+import argparse
+import datetime
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+import core
+import ui
+
+
+# ================== Fake clock ==================
+
+class FakeClock:
+    """수동으로 진행시키는 시계. tz 지정 시 DST 전환을 반영한 로컬 시각을 돌려준다."""
+
+    def __init__(self, start: datetime.datetime, tz=None):
+        self.tz = tz
+        if tz is not None:
+            self._t = start.replace(tzinfo=tz).timestamp()
+        else:
+            self._t = start.timestamp()
+        self._t0 = self._t
+        self._start = start
+
+    def advance(self, seconds: float):
+        self._t += seconds
+
+    def now(self) -> datetime.datetime:
+        if self.tz is not None:
+            return datetime.datetime.fromtimestamp(self._t, self.tz).replace(tzinfo=None)
+        return self._start + datetime.timedelta(seconds=self._t - self._t0)
+
+    def time(self) -> float:
+        return self._t
+
+
+# ================== Fake browser / backend ==================
+
+class FakeBrowser:
+    """launch_delay 후 창이 뜨고 track_sec마다 제목이 바뀌는 가짜 브라우저"""
+
+    def __init__(self, clock: FakeClock, launch_delay: float = 8.0, track_sec: float = 210.0,
+                 freeze_after: float = None):
+        self.clock = clock
+        self.launch_delay = launch_delay
+        self.track_sec = track_sec
+        self.freeze_after = freeze_after
+        self.launches = 0
+        self.launch_times = []
+        self.reloads = 0
+        self.switches = 0
+        self.fullscreens = 0
+        self.pid = None
+        self.hwnd = None
+        self._started = None
+        self._frozen_title = None
+
+    @property
+    def running(self) -> bool:
+        return self.pid is not None
+
+    def launch(self) -> int:
+        self.launches += 1
+        self.launch_times.append(self.clock.now())
+        self.pid = 10000 + self.launches
+        self.hwnd = None
+        self._started = self.clock.time()
+        self._frozen_title = None
+        return self.pid
+
+    def kill(self):
+        self.pid = None
+        self.hwnd = None
+
+    def reload(self):
+        if self.running:
+            self._started = self.clock.time()
+            self._frozen_title = None
+
+    def switch(self, url: str):
+        # 같은 창에서 새 페이지: 창 핸들 유지, 제목은 처음 곡부터
+        if self.running:
+            self.switches += 1
+            self._started = self.clock.time() - self.launch_delay
+            self._frozen_title = None
+
+    def frozen(self) -> bool:
+        return self._frozen_title is not None
+
+    def window(self):
+        if not self.running:
+            return None, ""
+        age = self.clock.time() - self._started - self.launch_delay
+        if age < 0:
+            return None, ""
+        if self.hwnd is None:
+            self.hwnd = 5000 + self.launches
+        if self._frozen_title is not None:
+            return self.hwnd, self._frozen_title
+        title = f"Track {int(age // self.track_sec) + 1} - YouTube - Google Chrome"
+        if self.freeze_after is not None and age >= self.freeze_after:
+            self._frozen_title = title
+        return self.hwnd, title
+
+
+class FakeProc:
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def poll(self):
+        return None
+
+
+class FakeWorker(QtCore.QObject):
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, browser: FakeBrowser, stop_event: threading.Event, bus, session=None, url: str = "",
+                 devtools: bool = True, parent=None):
+        super().__init__(parent)
+        self.devtools = devtools
+        self.stop_event = stop_event
+        self.bus = bus
+        self.session = session
+        self.url = url
+        self.browser = browser
+        self.proc = FakeProc(browser.launch())
+        self.done = threading.Event()
+        self.bus.publish(core.Launched(self.proc.pid, session=session))
+
+    def request_switch(self, url: str):
+        if not self.devtools:
+            # 실제 워커와 같이 실패 이벤트만 발행 → GUI가 브라우저 재실행
+            self.bus.publish(core.PlaybackError("switch_failed", "devtools_switch 꺼짐", session=self.session))
+            return
+        self.url = url
+        self.browser.switch(url)
+        self.bus.publish(core.TrackSwitched(url, 0.0, session=self.session))
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        self.stop_event.wait()
+        if self.browser.pid == self.proc.pid:
+            self.browser.kill()
+        self.bus.publish(core.Stopped("stop_requested", "graceful", 0.0, session=self.session))
+        self.finished.emit()
+        self.done.set()
+
+
+class FakeFallback:
+    """소리 없이 대체 재생 시작/중지만 기록"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.active = False
+        self.reason = ""
+        self.takeovers = []  # [(reason, 시작, 끝)]
+
+    def start(self, reason: str) -> bool:
+        if not self.active:
+            self.active = True
+            self.reason = reason
+            self.takeovers.append([reason, self.clock.time(), None])
+        return True
+
+    def stop(self, reason: str):
+        if self.active:
+            self.active = False
+            self.takeovers[-1][2] = self.clock.time()
+
+
+class FakeCpuSampler:
+    def __init__(self, browser: FakeBrowser):
+        self.browser = browser
+
+    def sample(self, now: float):
+        if not self.browser.running:
+            return None
+        return 0.0 if self.browser.frozen() else 15.0
+
+
+class FakeBackend:
+    def __init__(self, browser: FakeBrowser):
+        self.browser = browser
+        self.workers = []
+
+    def find_youtube_window(self, exclude_hwnd=None, root_pid=None):
+        if root_pid is not None and root_pid != self.browser.pid:
+            return None, ""
+        return self.browser.window()
+
+    def get_window_pid(self, hwnd) -> int:
+        return self.browser.pid
+
+    def is_window_alive(self, hwnd) -> bool:
+        return self.browser.running and hwnd == self.browser.hwnd
+
+    def send_fullscreen(self, hwnd):
+        self.browser.fullscreens += 1
+
+    def send_reload(self, hwnd):
+        self.browser.reloads += 1
+        self.browser.reload()
+
+    def close_process_tree(self, root_pid: int, timeout: float = 5.0):
+        self.browser.kill()
+
+    def kill_profile_processes(self):
+        self.browser.kill()
+
+    def cpu_sampler(self, root_pid: int):
+        return FakeCpuSampler(self.browser)
+
+    def create_worker(self, cfg: dict, stop_event: threading.Event, bus, session=None, url: str = ""):
+        worker = FakeWorker(self.browser, stop_event, bus, session, url, bool(cfg.get("devtools_switch", False)))
+        self.workers.append(worker)
+        return worker
+
+
+# ================== Replay ==================
+
+class SlotStats:
+    def __init__(self):
+        self.calls = 0
+        self.cpu = 0.0
+        self.max_cpu = 0.0
+
+    def add(self, cpu: float):
+        self.calls += 1
+        self.cpu += cpu
+        if cpu > self.max_cpu:
+            self.max_cpu = cpu
+
+
+class ReplayReport:
+    def __init__(self):
+        self.slots = {}
+        self.hour_cpu = {}
+        self.sessions = []
+        self.sim_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.recoveries = []
+        self.watchdog_summary = ""
+        self.launches = 0
+        self.launch_times = []
+        self.title_times = []  # TrackChanged 시각
+        self.reloads = 0
+        self.switches = 0
+        self.fullscreens = 0
+        self.schedule = (0, 0, 0, 0)
+        self.lead = 0.0
+        self.lead_summary = ""
+        self.fallbacks = []
+        self.relaunch_requests = 0
+        self.relaunch_failures = []  # 요청 후 relaunch_timeout 안에 새 브라우저가 뜨지 않은 시각
+
+    def cpu_total(self) -> float:
+        return sum(st.cpu for st in self.slots.values())
+
+    def ticks_total(self) -> int:
+        return sum(st.calls for st in self.slots.values())
+
+
+def _flush_posted_events():
+    QtCore.QCoreApplication.sendPostedEvents()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def _settle_workers(backend: FakeBackend):
+    """중지 요청된 가짜 워커의 finished 시그널을 결정적으로 GUI 쪽에 반영"""
+    pending = [w for w in backend.workers if w.stop_event.is_set()]
+    for w in pending:
+        w.done.wait(2.0)
+    backend.workers = [w for w in backend.workers if not w.stop_event.is_set()]
+    _flush_posted_events()
+
+
+def run_replay(cfg: dict, start: datetime.datetime, days: float, tz=None, step: float = 1.0,
+               idle_step: float = None, monitor_every: float = 2.0, test_mode: bool = False,
+               launch_delay: float = 8.0, track_sec: float = 210.0, freeze_after: float = None,
+               next_every: float = None, relaunch_timeout: float = 60.0) -> ReplayReport:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    ui.setup_app_style(app)
+
+    # 가상 시각의 상태 스냅샷이 실제 관리 폴더에 섞이지 않도록
+    cfg = dict(cfg, status={})
+    clock = FakeClock(start, tz)
+    prev_clock = core.clock
+    core.clock = clock
+
+    browser = FakeBrowser(clock, launch_delay, track_sec, freeze_after)
+    backend = FakeBackend(browser)
+    report = ReplayReport()
+
+    # 시작 지연 기록은 메모리에만 (실제 장비 기록과 섞지 않음)
+    player = FakeFallback(clock)
+    win = ui.MainWindow(
+        cfg, clock=clock, backend=backend, lead_model=core.LaunchLatencyModel(cfg), fallback_player=player,
+    )
+    # 실제 타이머는 쓰지 않고 아래 루프에서 직접 슬롯을 호출
+    win.clock_timer.stop()
+    win.track_timer.stop()
+    win.show()
+
+    # 재실행 요청마다 새 브라우저가 실제로 떴는지 확인
+    pending_relaunch = []  # [(요청 시각, 요청 시점 실행 횟수)]
+    relaunch_browser = win._relaunch_browser
+
+    def counting_relaunch(url=None):
+        report.relaunch_requests += 1
+        pending_relaunch.append((clock.time(), browser.launches))
+        relaunch_browser(url)
+
+    win._relaunch_browser = counting_relaunch
+    win.bus.subscribe(lambda e: report.title_times.append(clock.now()), core.TrackChanged)
+
+    idle_step = idle_step or step
+    start_t = clock.time()
+    end_t = start_t + days * 86400
+    next_monitor = start_t
+    next_switch = start_t + next_every * 60 if next_every else None
+
+    if test_mode:
+        win.radio_auto_test.setChecked(True)
+        win.start_playback()
+
+    def timed(name, fn):
+        t0 = time.thread_time()
+        fn()
+        cpu = time.thread_time() - t0
+        report.slots.setdefault(name, SlotStats()).add(cpu)
+        hour = int((clock.time() - start_t) // 3600)
+        report.hour_cpu[hour] = report.hour_cpu.get(hour, 0.0) + cpu
+
+    was_playing = win.is_playing
+    session_start = clock.now() if was_playing else None
+    wall0 = time.perf_counter()
+
+    try:
+        while clock.time() < end_t:
+            clock.advance(step if win.is_playing else idle_step)
+            now_t = clock.time()
+
+            timed("_update_clock_and_schedule", win._update_clock_and_schedule)
+            if win.countdown_timer.isActive():
+                timed("_on_timer_tick", win._on_timer_tick)
+            if now_t >= next_monitor:
+                timed("_monitor_youtube_window", win._monitor_youtube_window)
+                next_monitor = now_t + monitor_every
+
+            if next_switch is not None and now_t >= next_switch:
+                if win.is_playing:
+                    win.switch_track("user")
+                next_switch = now_t + next_every * 60
+
+            _settle_workers(backend)
+
+            for req in list(pending_relaunch):
+                if browser.launches > req[1] or not win.is_playing:
+                    pending_relaunch.remove(req)
+                elif now_t - req[0] >= relaunch_timeout:
+                    pending_relaunch.remove(req)
+                    report.relaunch_failures.append(clock.now())
+
+            if win.is_playing != was_playing:
+                if win.is_playing:
+                    session_start = clock.now()
+                else:
+                    report.sessions.append((session_start, clock.now()))
+                    session_start = None
+                was_playing = win.is_playing
+
+        if win.is_playing:
+            report.sessions.append((session_start, None))
+            win.stop_playback(auto=True)
+            _settle_workers(backend)
+    finally:
+        report.sim_seconds = clock.time() - start_t
+        report.wall_seconds = time.perf_counter() - wall0
+        report.recoveries = list(win.watchdog.recoveries)
+        report.watchdog_summary = win.watchdog.slo_summary()
+        report.launches = browser.launches
+        report.launch_times = list(browser.launch_times)
+        report.reloads = browser.reloads
+        report.switches = browser.switches
+        report.fullscreens = browser.fullscreens
+        report.schedule = (win.start_h, win.start_m, win.end_h, win.end_m)
+        report.lead = win.lead_model.lead
+        report.lead_summary = win.lead_model.summary()
+        report.fallbacks = [tuple(t) for t in player.takeovers]
+        win.tray.hide()
+        win.deleteLater()
+        _flush_posted_events()
+        core.clock = prev_clock
+
+    return report
+
+
+def missed_days(report: ReplayReport, start: datetime.datetime, days: float):
+    """
+    자동 재생 시간대가 있었지만 그 안에서 시작되지 않은 날짜 목록.
+    is_playing만으로는 판단하지 않음: 그날 종료 시각 전에 브라우저가 실제로 실행되고
+    그 뒤 곡 제목까지 잡혀야 시작된 것으로 본다.
+    """
+    sh, sm, eh, em = report.schedule
+    missed = []
+    day = start.date()
+    last = (start + datetime.timedelta(days=days)).date()
+    while day <= last:
+        start_dt = datetime.datetime.combine(day, datetime.time(sh, sm))
+        end_dt = datetime.datetime.combine(day, datetime.time(eh, em))
+        in_range = start <= start_dt and end_dt <= start + datetime.timedelta(days=days)
+        day_start = datetime.datetime.combine(day, datetime.time(0, 0))
+        launched = [t for t in report.launch_times if day_start <= t < end_dt]
+        titled = launched and any(launched[0] <= t < end_dt for t in report.title_times)
+        if in_range and not titled:
+            missed.append(day)
+        day += datetime.timedelta(days=1)
+    return missed
+
+
+def print_report(report: ReplayReport, start: datetime.datetime, days: float):
+    sim_hours = report.sim_seconds / 3600 or 1.0
+    print(f"시뮬레이션: {report.sim_seconds / 3600:.1f}시간 (실제 {report.wall_seconds:.2f}초)")
+    print(f"총 틱: {report.ticks_total()}  총 CPU: {report.cpu_total() * 1000:.1f}ms")
+    print(f"시뮬레이션 1시간당 CPU: 평균 {report.cpu_total() / sim_hours * 1000:.3f}ms, "
+          f"최대 {max(report.hour_cpu.values(), default=0.0) * 1000:.3f}ms")
+    print()
+    print("슬롯별:")
+    for name, st in sorted(report.slots.items()):
+        avg = st.cpu / st.calls * 1e6 if st.calls else 0.0
+        print(f"  {name:<30} {st.calls:>9}회  평균 {avg:8.1f}us  최대 {st.max_cpu * 1e6:8.1f}us")
+    print()
+    print(f"브라우저 실행 {report.launches}회, 새로고침 {report.reloads}회, URL 전환 {report.switches}회, "
+          f"전체화면 {report.fullscreens}회")
+    print(f"시작 앞당김: {report.lead:.0f}초 ({report.lead_summary})")
+    if report.relaunch_requests:
+        print(f"브라우저 재실행 요청 {report.relaunch_requests}회, 실행 안 됨 {len(report.relaunch_failures)}회")
+        for t in report.relaunch_failures:
+            print(f"  재실행 실패: {t:%Y-%m-%d %H:%M:%S} 요청 후 새 브라우저 없음")
+    for reason, t0, t1 in report.fallbacks:
+        length = f"{t1 - t0:.0f}s" if t1 is not None else "(진행 중)"
+        print(f"  대체 재생: {reason} {length}")
+    print("세션:")
+    for s, e in report.sessions:
+        e_txt = e.strftime("%Y-%m-%d %H:%M:%S") if e else "(진행 중)"
+        print(f"  {s:%Y-%m-%d %H:%M:%S} ~ {e_txt}")
+    for rec in report.recoveries:
+        ttr = f"{rec.ttr:.1f}s" if rec.ttr is not None else "-"
+        print(f"  워치독 복구: {rec.reason} {'>'.join(rec.actions)} ttr={ttr}")
+    if report.recoveries:
+        print(f"  워치독 요약: {report.watchdog_summary}")
+    missed = missed_days(report, start, days)
+    if missed:
+        print("자동 시작 누락: " + ", ".join(d.isoformat() for d in missed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 시계로 스케줄 리플레이")
+    parser.add_argument("--config", default=os.path.join(core.BASE_DIR, "config.json"))
+    parser.add_argument("--start", default=None, help="시작 로컬 시각 (YYYY-MM-DDTHH:MM), 기본: 오늘 00:00")
+    parser.add_argument("--days", type=float, default=7.0)
+    parser.add_argument("--tz", default=None, help="IANA 시간대 (예: Europe/Berlin) — DST 전환 재현용")
+    parser.add_argument("--step", type=float, default=1.0, help="재생 중 틱 간격(초)")
+    parser.add_argument("--idle-step", type=float, default=None, help="정지 상태 틱 간격(초)")
+    parser.add_argument("--test-mode", action="store_true", help="테스트 모드로 한 번 재생")
+    parser.add_argument("--launch-delay", type=float, default=8.0, help="창이 뜨기까지 걸리는 시간(초)")
+    parser.add_argument("--track-sec", type=float, default=210.0, help="곡 길이(초)")
+    parser.add_argument("--freeze-after", type=float, default=None, help="재생 n초 후 정지 상황 재현")
+    parser.add_argument("--next-every", type=float, default=None, help="재생 중 n분마다 다음 곡 전환 요청")
+    parser.add_argument("--no-devtools", action="store_true", help="devtools_switch 끔 (전환 실패 → 재실행 경로)")
+    args = parser.parse_args(argv)
+
+    cfg = core.load_config(args.config)
+    if args.no_devtools:
+        cfg = dict(cfg, devtools_switch=False)
+    tz = None
+    if args.tz:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo(args.tz)
+
+    if args.start:
+        start = datetime.datetime.strptime(args.start, "%Y-%m-%dT%H:%M")
+    else:
+        start = datetime.datetime.combine(datetime.date.today(), datetime.time(0, 0))
+
+    core.LOG_FILE = os.path.join(core.TEMP_DIR, "MusicBot_Replay.txt")
+    report = run_replay(
+        cfg, start, args.days, tz=tz, step=args.step, idle_step=args.idle_step,
+        test_mode=args.test_mode, launch_delay=args.launch_delay,
+        track_sec=args.track_sec, freeze_after=args.freeze_after, next_every=args.next_every,
+    )
+    print_report(report, start, args.days)
+    return 2 if report.relaunch_failures or missed_days(report, start, args.days) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# soak.py
+
+# 시작/정지 반복(soak) 테스트
+# 가짜 브라우저(자식 프로세스 + 유튜브 제목의 창)를 실제 경로(QThread, PlayerWorker,
+# 창 스캐너, 프로세스 종료)로 수천 번 띄우고 내리면서 누수를 측정한다.
+#
+#   python soak.py --cycles 2000
+import os
+import gc
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+import psutil
+from PyQt5 import QtCore, QtWidgets
+
+import core
+import ui
+
+
+STAND_IN_MARKER = "--soak-stand-in"
+CHILD_MARKER = "--soak-child"
+
+
+# ================== Stand-in browser ==================
+
+def run_stand_in(argv):
+    """브라우저 대역: 자식 프로세스 2개를 띄우고 제목이 바뀌는 창을 표시"""
+    url = argv[-1] if argv else ""
+    children = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), CHILD_MARKER])
+        for _ in range(2)
+    ]
+
+    app = QtWidgets.QApplication([sys.argv[0]])
+    win = QtWidgets.QWidget()
+    win.resize(320, 120)
+    counter = [0]
+
+    def next_title():
+        counter[0] += 1
+        win.setWindowTitle(f"Soak Track {counter[0]} ({url}) - YouTube - Google Chrome")
+
+    next_title()
+    timer = QtCore.QTimer()
+    timer.timeout.connect(next_title)
+    timer.start(5000)
+    win.show()
+    code = app.exec_()
+    for c in children:
+        c.kill()
+    return code
+
+
+def run_child():
+    # 부모가 죽어도 남는지 확인하기 위한 대기 프로세스
+    time.sleep(3600)
+    return 0
+
+
+class StandInWorker(core.PlayerWorker):
+    def build_command(self, browser_path: str, url: str) -> list:
+        return [
+            sys.executable,
+            os.path.abspath(__file__),
+            STAND_IN_MARKER,
+            f"--user-data-dir={core.PROFILE_DIR}",
+            url,
+        ]
+
+
+class SoakBackend(core.DesktopBackend):
+    def create_worker(self, cfg: dict, stop_event: threading.Event, bus, session=None, url: str = ""):
+        return StandInWorker(cfg, stop_event, bus, session, url)
+
+
+# ================== Measurement ==================
+
+def leftover_processes():
+    found = []
+    for proc in psutil.process_iter(["pid", "cmdline"]):
+        try:
+            cmdline = proc.info.get("cmdline") or []
+        except Exception:
+            continue
+        if STAND_IN_MARKER in cmdline or CHILD_MARKER in cmdline:
+            found.append(proc.pid)
+    return found
+
+
+def sample(me: psutil.Process) -> dict:
+    gc.collect()
+    try:
+        handles = me.num_handles()
+    except AttributeError:
+        handles = me.num_fds()
+    return {
+        "os_threads": me.num_threads(),
+        "py_threads": threading.active_count(),
+        "objects": len(gc.get_objects()),
+        "rss_kb": me.memory_info().rss / 1024.0,
+        "handles": handles,
+        "leftover": len(leftover_processes()),
+    }
+
+
+def slope(values) -> float:
+    """사이클당 증가량(최소제곱 기울기)"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(values) / n
+    num = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    den = sum((i - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+def pump(app: QtWidgets.QApplication, until, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 20)
+        QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        if until():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+# ================== Soak loop ==================
+
+def run_soak(cfg: dict, cycles: int, window_timeout: float, wait_window: bool, csv_path: str = None):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    cfg = dict(cfg)
+    cfg["browser_path"] = sys.executable
+    cfg["tracks"] = cfg.get("tracks") or ["https://www.youtube.com/watch?v=soak"]
+    cfg["watchdog"] = dict(cfg.get("watchdog", {}), enabled=False)
+    cfg["status"] = {}
+    cfg["fallback"] = {"enabled": False}
+
+    win = ui.MainWindow(cfg, backend=SoakBackend(), lead_model=core.LaunchLatencyModel(cfg))
+    # 스케줄 자동 시작/중지가 끼어들지 않도록 시계 타이머는 끔
+    win.clock_timer.stop()
+
+    # 워커 스레드에서 발행되므로 직접 구독자로 횟수만 셈
+    launches = [0]
+
+    def count_launch(event):
+        launches[0] += 1
+
+    win.bus.subscribe(count_launch, core.Launched)
+
+    me = psutil.Process()
+    samples = []
+    window_misses = 0
+    launch_misses = 0
+    stop_timeouts = 0
+    csv = open(csv_path, "w", encoding="utf-8") if csv_path else None
+
+    try:
+        for i in range(cycles):
+            launched = launches[0]
+            win.start_playback(auto_trigger=True)
+            # 브라우저가 실제로 뜬 뒤에 정지 (아무것도 띄우지 않은 사이클을 정상으로 세지 않도록)
+            if not pump(app, lambda: launches[0] > launched, window_timeout):
+                launch_misses += 1
+                core.write_log(f"[soak] cycle {i}: 브라우저 실행 안 됨")
+            elif wait_window and not pump(app, lambda: bool(win.current_track_title), window_timeout):
+                window_misses += 1
+            win.stop_playback(auto=True)
+            if not pump(app, lambda: not win._worker_running, 15.0):
+                stop_timeouts += 1
+                core.write_log(f"[soak] cycle {i}: 워커 종료 대기 시간 초과")
+            pump(app, lambda: False, 0.05)
+
+            row = sample(me)
+            samples.append(row)
+            if csv:
+                if i == 0:
+                    csv.write("cycle," + ",".join(row) + "\n")
+                csv.write(f"{i}," + ",".join(f"{v:.1f}" for v in row.values()) + "\n")
+            if (i + 1) % 50 == 0 or i == cycles - 1:
+                print(f"[{i + 1}/{cycles}] " + " ".join(f"{k}={v:.0f}" for k, v in row.items()))
+    finally:
+        if csv:
+            csv.close()
+        if win.scanner is not None:
+            win.scanner.stop()
+        win.tray.hide()
+
+    return samples, {
+        "launches": launches[0],
+        "launch_misses": launch_misses,
+        "window_misses": window_misses,
+        "stop_timeouts": stop_timeouts,
+    }
+
+
+def report(samples, warmup: int, limits: dict, counts: dict) -> bool:
+    steady = samples[warmup:] if len(samples) > warmup + 1 else samples
+    ok = True
+    print()
+    print(f"사이클 {len(samples)}회 (워밍업 {len(samples) - len(steady)}회 제외), "
+          f"브라우저 실행 {counts['launches']}회, 창 인식 실패 {counts['window_misses']}회")
+    if counts["launches"] != len(samples) or counts["launch_misses"]:
+        ok = False
+        print(f"  실행 안 된 사이클 {counts['launch_misses']}회 (실행 {counts['launches']}/{len(samples)})  FAIL")
+    if counts["stop_timeouts"]:
+        ok = False
+        print(f"  워커 종료 대기 시간 초과 {counts['stop_timeouts']}회  FAIL")
+    for key, limit in limits.items():
+        values = [row[key] for row in steady]
+        growth = slope(values)
+        status = "OK"
+        if growth > limit:
+            status = "FAIL"
+            ok = False
+        print(f"  {key:<11} 처음 {values[0]:>12.1f}  마지막 {values[-1]:>12.1f}  "
+              f"사이클당 {growth:+10.4f} (허용 {limit})  {status}")
+
+    left = leftover_processes()
+    if left:
+        ok = False
+        print(f"  남은 대역 프로세스: {left}  FAIL")
+    return ok
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == STAND_IN_MARKER:
+        return run_stand_in(argv[1:])
+    if argv and argv[0] == CHILD_MARKER:
+        return run_child()
+
+    parser = argparse.ArgumentParser(description="시작/정지 반복 누수 테스트")
+    parser.add_argument("--config", default=os.path.join(core.BASE_DIR, "config.json"))
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--window-timeout", type=float, default=15.0)
+    parser.add_argument("--no-window", action="store_true", help="창 인식을 기다리지 않음")
+    parser.add_argument("--csv", default=None, help="사이클별 측정값 CSV 경로")
+    parser.add_argument("--max-rss-kb", type=float, default=4.0, help="사이클당 허용 RSS 증가(KB)")
+    parser.add_argument("--max-objects", type=float, default=5.0, help="사이클당 허용 파이썬 객체 증가")
+    parser.add_argument("--max-threads", type=float, default=0.01, help="사이클당 허용 스레드 증가")
+    parser.add_argument("--max-handles", type=float, default=0.05, help="사이클당 허용 핸들 증가")
+    parser.add_argument("--max-leftover", type=float, default=0.0, help="사이클당 허용 잔여 프로세스 증가")
+    args = parser.parse_args(argv)
+
+    # 실제 프로필/로그와 섞이지 않도록 분리
+    core.PROFILE_DIR = os.path.join(core.TEMP_DIR, "MusicBotSoakProfile")
+    core.LOG_FILE = os.path.join(core.TEMP_DIR, "MusicBot_Soak.txt")
+
+    cfg = core.load_config(args.config)
+    samples, counts = run_soak(cfg, args.cycles, args.window_timeout, not args.no_window, args.csv)
+    limits = {
+        "rss_kb": args.max_rss_kb,
+        "objects": args.max_objects,
+        "os_threads": args.max_threads,
+        "py_threads": args.max_threads,
+        "handles": args.max_handles,
+        "leftover": args.max_leftover,
+    }
+    ok = report(samples, args.warmup, limits, counts)
+    print("결과: " + ("통과" if ok else "실패"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
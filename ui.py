@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import os
-import time
 import math
 import datetime
 import threading
@@ -9,6 +8,8 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction
 
 import core
+import diag
+import fallback
 
 
 # ================= 스타일(UI) =================
@@ -84,6 +85,8 @@ def setup_app_style(app: QtWidgets.QApplication):
 # ================= UI Widgets =================
 
 class EqualizerWidget(QtWidgets.QWidget):
+    INSTRUMENTED_SLOTS = ("paintEvent", "_update_levels")
+
     def __init__(self, parent=None, bar_count=5):
         super().__init__(parent)
         self.bar_count = bar_count
@@ -141,6 +144,8 @@ class EqualizerWidget(QtWidgets.QWidget):
 
 
 class StatusDotWidget(QtWidgets.QWidget):
+    INSTRUMENTED_SLOTS = ("paintEvent", "_tick")
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._active = False
@@ -193,9 +198,44 @@ class MainWindow(QtWidgets.QMainWindow):
     MODE_AUTO = "auto"
     MODE_AUTO_TEST = "auto_test"
 
-    def __init__(self, cfg: dict):
+    # 워커 종료(세션 id). 워커는 finished 직후 deleteLater되므로 sender()로는 구분할 수 없음
+    worker_finished = QtCore.pyqtSignal(int)
+
+    # diagnostics.slot_timing 사용 시 실행 시간을 재는 슬롯/타이머 콜백
+    INSTRUMENTED_SLOTS = (
+        "_update_clock_and_schedule",
+        "_on_timer_tick",
+        "_monitor_youtube_window",
+        "start_playback",
+        "stop_playback",
+        "_on_worker_finished",
+        "_on_player_event",
+        "_apply_window_snapshot",
+        "_on_mode_changed",
+        "_on_toggle_topmost",
+        "_toggle_test_mode",
+        "_on_tray_activated",
+        "_tray_show_window",
+        "_tray_hide_window",
+        "_tray_refresh_status",
+        "_tray_start_profile",
+        "_on_profile_finished",
+        "_tray_next_playlist",
+        "_tray_exit_app",
+        "_open_log",
+        "handle_instance_command",
+        "showEvent",
+        "closeEvent",
+    )
+
+    def __init__(self, cfg: dict, clock=None, backend=None, lead_model=None, fallback_player=None):
         super().__init__()
         self.cfg = cfg
+        self.clock = clock or core.clock
+        self.backend = backend or core.DesktopBackend()
+        # 자동 시작을 실제 시작 지연만큼 앞당김 (장비별 기록)
+        self.lead_model = lead_model or core.LaunchLatencyModel(cfg, core.LATENCY_FILE)
+        self._launch_started_at = None
 
         ui_cfg = cfg.get("ui", {})
         self.setWindowTitle(ui_cfg.get("window_title", "YouTube Music Timer"))
@@ -208,6 +248,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.end_h, self.end_m = core.parse_hhmm(cfg.get("end_time", "07:50"))
         self.test_duration_min = int(cfg.get("test_duration_min", 3))
 
+        # 시간대별 플레이리스트와 현재 재생 중인 URL (실행 중 브라우저에서 전환)
+        self.playlists = core.parse_playlists(cfg)
+        self.playlist_name = None
+        self.playlist_tracks = []
+        self.current_url = ""
+
         self.is_playing = False
         self.mode = self.MODE_AUTO
 
@@ -219,10 +265,71 @@ class MainWindow(QtWidgets.QMainWindow):
         self.youtube_hwnd = None
         self.youtube_detect_time = None
         self.last_auto_start_date = None
+        self.last_play_date = None
+        self.last_error = None
 
         self.thread = None
         self.worker = None
         self.stop_event = None
+        self._worker_running = False
+        self._relaunch_pending = False
+        self._relaunch_url = None
+        self._start_pending = False
+        self.shutdown_timeout = float(cfg.get("shutdown_timeout_sec", 5))
+
+        self.watchdog = core.PlaybackWatchdog(cfg)
+        self.cpu_sampler = None
+        self.tracked_alive = None
+
+        # 재생 이벤트: 로그/통계/기록은 발행 스레드에서, 화면은 GUI 스레드에서 묶어서 처리
+        self.session_id = 0
+        self.bus = core.EventBus(self)
+        self.event_metrics = core.EventMetrics()
+        self.event_history = core.EventHistory()
+        self.bus.subscribe(core.log_event)
+        self.bus.subscribe(self.event_metrics.record)
+        self.bus.subscribe(self.event_history.record)
+        self.bus.subscribe(
+            self._on_player_event,
+            core.LaunchStarted, core.Launched, core.TrackChanged, core.TrackSwitched, core.Stopping,
+            core.PlaybackError,
+            gui=True,
+        )
+
+        # 화면 갱신 무효화(숨김 상태에서는 라벨 갱신 생략, showEvent에서 재계산)
+        self._pending_labels = {}
+        self._pending_styles = {}
+        self._animations_on = False
+        self._ui_update_count = 0
+        self._ui_stats_minute = int(self.clock.time() // 60)
+        self.ui_updates_per_minute = 0
+        self.log_ui_stats = bool(ui_cfg.get("log_ui_stats", False))
+
+        diag_cfg = cfg.get("diagnostics", {})
+        self.profiler = diag.SamplingProfiler(
+            float(diag_cfg.get("profile_seconds", 30)),
+            float(diag_cfg.get("profile_interval_ms", 5)),
+            self,
+        )
+        self.profiler.finished.connect(self._on_profile_finished)
+        self.worker_finished.connect(self._on_worker_finished)
+
+        # 브라우저가 실패하거나 제목이 늦으면 로컬 오디오 캐시로 대신 재생
+        self.fallback = fallback_player or fallback.FallbackPlayer.from_config(cfg, self)
+        self.fallback_deadline = float(cfg.get("fallback", {}).get("first_title_deadline_sec", 20))
+        self._fallback_session = None
+
+        # 관리용 상태 스냅샷 (status.dir 설정 시)
+        self.status_writer = core.StatusWriter.from_config(cfg)
+        if self.status_writer is not None:
+            # 재시작해도 오늘 이미 재생했는지 유지 (fleet의 시작 누락 판정용)
+            try:
+                self.last_play_date = datetime.date.fromisoformat(
+                    self.status_writer.load_previous().get("last_play_date") or ""
+                )
+            except ValueError:
+                pass
+            self.status_writer.start()
 
         self._build_ui()
         self._create_tray_icon()
@@ -234,6 +341,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.track_timer.timeout.connect(self._monitor_youtube_window)
         self.track_timer.start(2000)
 
+        # 창 탐색은 백그라운드 스레드에서 (백엔드가 지원하지 않으면 track_timer에서 동기 탐색)
+        self.scanner = None
+        create_scanner = getattr(self.backend, "create_scanner", None)
+        if create_scanner is not None:
+            self.scanner = create_scanner(cfg, int(self.winId()))
+        if self.scanner is not None:
+            self.scanner.snapshot.connect(self._apply_window_snapshot)
+            self.scanner.start()
+
         self.clock_timer = QtCore.QTimer(self)
         self.clock_timer.timeout.connect(self._update_clock_and_schedule)
         self.clock_timer.start(1000)
@@ -263,13 +379,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.action_hide = QAction("숨기기", self)
         self.action_refresh = QAction("상태 리프레시", self)
         self.action_log = QAction("로그 보기", self)
+        self.action_next = QAction("다음 플레이리스트", self)
+        self.action_profile = QAction(f"프로파일 기록 ({self.profiler.seconds:.0f}초)", self)
         self.action_exit = QAction("종료", self)
 
         self.tray_menu.addAction(self.action_open)
         self.tray_menu.addAction(self.action_hide)
         self.tray_menu.addSeparator()
+        self.tray_menu.addAction(self.action_next)
         self.tray_menu.addAction(self.action_refresh)
         self.tray_menu.addAction(self.action_log)
+        self.tray_menu.addAction(self.action_profile)
         self.tray_menu.addSeparator()
         self.tray_menu.addAction(self.action_exit)
 
@@ -280,6 +400,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.action_hide.triggered.connect(self._tray_hide_window)
         self.action_refresh.triggered.connect(self._tray_refresh_status)
         self.action_log.triggered.connect(self._open_log)
+        self.action_next.triggered.connect(self._tray_next_playlist)
+        self.action_profile.triggered.connect(self._tray_start_profile)
         self.action_exit.triggered.connect(self._tray_exit_app)
 
     def _on_tray_activated(self, reason):
@@ -295,12 +417,50 @@ class MainWindow(QtWidgets.QMainWindow):
         self.hide()
 
     def _tray_refresh_status(self):
-        msg = self.next_play_label.text()
+        msg = self._schedule_status_text(self.clock.now())
+        msg += f"\nUI 업데이트: {self.ui_updates_per_minute}회/분"
+        msg += f"\n워치독: {self.watchdog.slo_summary()}"
+        msg += f"\n시작 앞당김: {self.lead_model.lead:.0f}초 ({self.lead_model.summary()})"
         self.tray.showMessage("현재 상태", msg, QSystemTrayIcon.Information, 5000)
 
+    def _tray_next_playlist(self):
+        if not self.switch_track("user"):
+            self.tray.showMessage("다음 플레이리스트", "재생 중일 때만 전환할 수 있습니다.", QSystemTrayIcon.Information, 3000)
+
+    def _tray_start_profile(self):
+        if not self.profiler.start():
+            self.tray.showMessage("프로파일", "이미 기록 중입니다.", QSystemTrayIcon.Information, 3000)
+            return
+        core.write_log(f"프로파일 기록 시작 ({self.profiler.seconds:.0f}초)")
+        self.action_profile.setEnabled(False)
+
+    def _on_profile_finished(self, path: str):
+        self.action_profile.setEnabled(True)
+        msg = f"저장 위치: {path}" if path else "프로파일 기록에 실패했습니다."
+        self.tray.showMessage("프로파일 완료", msg, QSystemTrayIcon.Information, 5000)
+
+    # 다른 실행(app.py --start 등)에서 전달된 명령
+    def handle_instance_command(self, command: str):
+        if command == "show":
+            self._tray_show_window()
+        elif command == "start":
+            self._tray_show_window()
+            self.start_playback(interactive=False)
+        elif command == "stop":
+            self.stop_playback()
+        elif command == "next":
+            self.switch_track("api")
+
     def _tray_exit_app(self):
         if self.is_playing:
             self.stop_playback(auto=True)
+        if self._worker_running and self.thread is not None:
+            # 브라우저 정상 종료가 끝날 때까지 대기 (실행 중인 QThread 파괴 방지)
+            self.thread.wait(int((self.shutdown_timeout + 5) * 1000))
+        if self.scanner is not None:
+            self.scanner.stop()
+        if self.status_writer is not None:
+            self.status_writer.stop()
         self.tray.hide()
         QtWidgets.qApp.quit()
 
@@ -466,6 +626,87 @@ class MainWindow(QtWidgets.QMainWindow):
         self._reset_timer()
         self._update_schedule_status()
 
+    # ---------- Display invalidation ----------
+
+    def _set_label(self, label: QtWidgets.QLabel, text: str):
+        """창이 숨겨져 있으면 값만 보관하고 표시 시점에 반영"""
+        if not self.isVisible():
+            self._pending_labels[label] = text
+            return
+        self._pending_labels.pop(label, None)
+        if label.text() != text:
+            label.setText(text)
+            self._count_ui_update()
+
+    def _set_style(self, widget: QtWidgets.QWidget, style: str):
+        if not self.isVisible():
+            self._pending_styles[widget] = style
+            return
+        self._pending_styles.pop(widget, None)
+        if widget.styleSheet() != style:
+            widget.setStyleSheet(style)
+            self._count_ui_update()
+
+    def _set_progress(self, maximum: int, value: int):
+        if not self.isVisible():
+            return
+        if self.progress_bar.maximum() != maximum:
+            self.progress_bar.setMaximum(maximum)
+            self._count_ui_update()
+        if self.progress_bar.value() != value:
+            self.progress_bar.setValue(value)
+            self._count_ui_update()
+
+    def _set_animations(self, active: bool):
+        self._animations_on = active
+        if active and self.isVisible():
+            self.eq_widget.start()
+            self.status_dot.setActive(True)
+        else:
+            self._pause_animations()
+
+    def _pause_animations(self):
+        self.eq_widget.stop()
+        self.status_dot.setActive(False)
+
+    def _count_ui_update(self):
+        self._ui_update_count += 1
+
+    def _roll_ui_stats(self):
+        minute = int(self.clock.time() // 60)
+        if minute == self._ui_stats_minute:
+            return
+        self.ui_updates_per_minute = self._ui_update_count
+        self._ui_update_count = 0
+        self._ui_stats_minute = minute
+        if self.log_ui_stats:
+            state = "표시" if self.isVisible() else "숨김"
+            core.write_log(f"UI 업데이트 {self.ui_updates_per_minute}회/분 (창 {state})")
+
+    def _refresh_display(self):
+        """현재 상태로부터 화면 전체를 한 번에 재계산"""
+        for label, text in list(self._pending_labels.items()):
+            self._set_label(label, text)
+        for widget, style in list(self._pending_styles.items()):
+            self._set_style(widget, style)
+
+        now = self.clock.now()
+        self._set_label(self.clock_label, now.strftime("%H:%M:%S"))
+        if self.mode == self.MODE_AUTO:
+            self._update_auto_mode_remaining(now)
+        else:
+            self._update_countdown_display()
+        self._update_schedule_status(now)
+        self._set_animations(self._animations_on)
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        super().showEvent(event)
+        self._refresh_display()
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        super().hideEvent(event)
+        self._pause_animations()
+
     # ---------- Mode / Timer ----------
 
     def _on_mode_changed(self):
@@ -484,31 +725,30 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.mode == self.MODE_AUTO_TEST:
             self.total_seconds = self.test_duration_min * 60
             self.elapsed_seconds = 0
-            self.progress_bar.setMaximum(self.total_seconds)
-            self.progress_bar.setValue(0)
-            self.total_label.setText(f"테스트 재생: {self.test_duration_min}분")
+            self._set_label(self.total_label, f"테스트 재생: {self.test_duration_min}분")
             self._update_countdown_display()
         else:
             # 자동 모드는 “남은 시간” 기준 표시
-            auto_total = ((self.end_h * 60 + self.end_m) - (self.start_h * 60 + self.start_m)) * 60
-            self.progress_bar.setMaximum(max(auto_total, 1))
-            self.progress_bar.setValue(0)
             self.elapsed_seconds = 0
-            self.total_label.setText(f"자동 재생: {self.start_h:02d}:{self.start_m:02d} ~ {self.end_h:02d}:{self.end_m:02d}")
+            self._set_label(self.total_label, f"자동 재생: {self.start_h:02d}:{self.start_m:02d} ~ {self.end_h:02d}:{self.end_m:02d}")
             self._update_auto_mode_remaining()
 
     def _update_countdown_display(self):
+        if not self.isVisible():
+            return
         remaining = max(self.total_seconds - self.elapsed_seconds, 0)
         rm, rs = divmod(remaining, 60)
-        self.timer_label.setText(f"{rm:02d}:{rs:02d}")
+        self._set_label(self.timer_label, f"{rm:02d}:{rs:02d}")
 
-        self.progress_bar.setValue(self.elapsed_seconds)
+        self._set_progress(max(self.total_seconds, 1), self.elapsed_seconds)
         em, es = divmod(self.elapsed_seconds, 60)
-        self.elapsed_label.setText(f"경과: {em:02d}:{es:02d}")
+        self._set_label(self.elapsed_label, f"경과: {em:02d}:{es:02d}")
 
     def _update_auto_mode_remaining(self, now=None):
+        if not self.isVisible():
+            return
         if now is None:
-            now = datetime.datetime.now()
+            now = self.clock.now()
 
         today = now.date()
         start_dt = datetime.datetime.combine(today, datetime.time(self.start_h, self.start_m))
@@ -523,7 +763,7 @@ class MainWindow(QtWidgets.QMainWindow):
             remaining = 0
 
         rm, rs = divmod(remaining, 60)
-        self.timer_label.setText(f"{rm:02d}:{rs:02d}")
+        self._set_label(self.timer_label, f"{rm:02d}:{rs:02d}")
 
         elapsed_from_start = int((now - start_dt).total_seconds())
         if elapsed_from_start < 0:
@@ -531,11 +771,10 @@ class MainWindow(QtWidgets.QMainWindow):
         if elapsed_from_start > total:
             elapsed_from_start = total
 
-        self.progress_bar.setMaximum(total)
-        self.progress_bar.setValue(elapsed_from_start)
+        self._set_progress(total, elapsed_from_start)
 
         em, es = divmod(max(elapsed_from_start, 0), 60)
-        self.elapsed_label.setText(f"경과: {em:02d}:{es:02d}")
+        self._set_label(self.elapsed_label, f"경과: {em:02d}:{es:02d}")
 
     def _on_timer_tick(self):
         if not self.is_playing:
@@ -566,21 +805,22 @@ class MainWindow(QtWidgets.QMainWindow):
         return h, m, s
 
     def _update_schedule_status(self, now=None):
+        if not self.isVisible():
+            return
         if now is None:
-            now = datetime.datetime.now()
+            now = self.clock.now()
+        self._set_label(self.next_play_label, self._schedule_status_text(now))
 
+    def _schedule_status_text(self, now: datetime.datetime) -> str:
         if self.mode == self.MODE_AUTO_TEST:
             if not self.is_playing and self.elapsed_seconds == 0:
-                self.next_play_label.setText(
-                    f"테스트 모드입니다.\n[재생 시작] 버튼을 누르면 {self.test_duration_min}분 동안 음악이 재생됩니다."
-                )
+                return f"테스트 모드입니다.\n[재생 시작] 버튼을 누르면 {self.test_duration_min}분 동안 음악이 재생됩니다."
             elif self.is_playing:
                 remaining = max(self.total_seconds - self.elapsed_seconds, 0)
                 rm, rs = divmod(remaining, 60)
-                self.next_play_label.setText(f"테스트 재생 중 · 남은 시간 {rm:02d}분 {rs:02d}초")
+                return f"테스트 재생 중 · 남은 시간 {rm:02d}분 {rs:02d}초"
             else:
-                self.next_play_label.setText("테스트 재생이 종료되었습니다.\n다시 테스트하려면 [재생 시작] 버튼을 눌러주세요.")
-            return
+                return "테스트 재생이 종료되었습니다.\n다시 테스트하려면 [재생 시작] 버튼을 눌러주세요."
 
         today = now.date()
         start_dt = datetime.datetime.combine(today, datetime.time(self.start_h, self.start_m))
@@ -589,30 +829,34 @@ class MainWindow(QtWidgets.QMainWindow):
         if now < start_dt:
             delta = start_dt - now
             h, m, s = self._format_timedelta_hms(delta)
+            if self.is_playing:
+                return f"재생 준비 중 · 시작까지 {h}시간 {m}분 {s}초 남았습니다."
             text = f"다음 재생까지 {h}시간 {m}분 {s}초 남았습니다."
-            detail = f"(오늘 자동 재생: {self.start_h:02d}:{self.start_m:02d} ~ {self.end_h:02d}:{self.end_m:02d})"
-            self.next_play_label.setText(text + "\n" + detail)
+            detail = f"(오늘 자동 재생: {self.start_h:02d}:{self.start_m:02d} ~ {self.end_h:02d}:{self.end_m:02d}"
+            if self.lead_model.lead >= 1:
+                detail += f", 브라우저는 {self.lead_model.lead:.0f}초 먼저 실행"
+            return text + "\n" + detail + ")"
 
         elif start_dt <= now < end_dt:
             delta_to_end = end_dt - now
             h, m, s = self._format_timedelta_hms(delta_to_end)
             prefix = "재생 중 · " if self.is_playing else "재생 준비 중 · "
-            self.next_play_label.setText(f"{prefix}종료까지 {h}시간 {m}분 {s}초 남았습니다.")
+            return f"{prefix}종료까지 {h}시간 {m}분 {s}초 남았습니다."
 
         else:
             tomorrow = today + datetime.timedelta(days=1)
             next_start = datetime.datetime.combine(tomorrow, datetime.time(self.start_h, self.start_m))
             delta = next_start - now
             h, m, s = self._format_timedelta_hms(delta)
-            self.next_play_label.setText(
-                f"오늘 자동 재생이 모두 종료되었습니다.\n내일 첫 재생까지 {h}시간 {m}분 {s}초 남았습니다."
-            )
+            return f"오늘 자동 재생이 모두 종료되었습니다.\n내일 첫 재생까지 {h}시간 {m}분 {s}초 남았습니다."
 
     # ---------- Clock + auto start/stop ----------
 
     def _update_clock_and_schedule(self):
-        now = datetime.datetime.now()
-        self.clock_label.setText(now.strftime("%H:%M:%S"))
+        now = self.clock.now()
+        self._roll_ui_stats()
+        if self.isVisible():
+            self._set_label(self.clock_label, now.strftime("%H:%M:%S"))
 
         if self.mode == self.MODE_AUTO:
             self._update_auto_mode_remaining(now)
@@ -621,7 +865,9 @@ class MainWindow(QtWidgets.QMainWindow):
             start_dt = datetime.datetime.combine(today, datetime.time(self.start_h, self.start_m))
             end_dt = datetime.datetime.combine(today, datetime.time(self.end_h, self.end_m))
 
-            if start_dt <= now < end_dt:
+            # 측정된 시작 지연만큼 먼저 실행해 start_dt에 소리가 나도록
+            trigger_dt = start_dt - datetime.timedelta(seconds=self.lead_model.lead)
+            if trigger_dt <= now < end_dt:
                 if not self.is_playing and self.last_auto_start_date != today:
                     self.last_auto_start_date = today
                     core.write_log("자동 시간 모드 - 자동 시작 시간 도달 → 재생 자동 시작")
@@ -632,54 +878,178 @@ class MainWindow(QtWidgets.QMainWindow):
                 self._append_status("자동 시간 모드 - 종료 시각 도달, 자동 중지")
                 self.stop_playback(auto=True)
 
+        # 시간대가 바뀌면 실행 중인 브라우저에서 해당 플레이리스트로 전환
+        if self.is_playing and self.playlists:
+            name, tracks = core.playlist_for_time(self.playlists, now, self.cfg.get("tracks") or [])
+            if name != self.playlist_name:
+                self.switch_track("schedule", name, tracks)
+
+        self._check_fallback_deadline()
+
+        if self.status_writer is not None:
+            self.status_writer.update(self._status_snapshot(now))
+
         self._update_schedule_status(now)
 
+    def _status_snapshot(self, now: datetime.datetime) -> dict:
+        # 분 단위로만 바뀌도록 (내용이 같으면 StatusWriter가 heartbeat 때만 기록)
+        next_start = datetime.datetime.combine(now.date(), datetime.time(self.start_h, self.start_m))
+        if now >= next_start:
+            next_start += datetime.timedelta(days=1)
+        return {
+            "is_playing": self.is_playing,
+            "mode": self.mode,
+            "current_track_title": self.current_track_title,
+            "playlist": self.playlist_name,
+            "local_time": now.strftime("%Y-%m-%d %H:%M"),
+            "start_time": f"{self.start_h:02d}:{self.start_m:02d}",
+            "end_time": f"{self.end_h:02d}:{self.end_m:02d}",
+            "next_start": next_start.strftime("%Y-%m-%d %H:%M"),
+            "last_play_date": self.last_play_date.isoformat() if self.last_play_date else None,
+            "last_error": self.last_error,
+            "fallback": bool(self.fallback is not None and self.fallback.active),
+        }
+
     # ---------- YouTube window monitor ----------
 
     def _monitor_youtube_window(self):
-        if not self.is_playing:
+        # 시작 대기 중: 창/제목/생존 상태는 아직 종료 중인 이전 브라우저 것이므로 탐색·워치독 생략
+        if not self.is_playing or self._start_pending:
+            return
+
+        if self.scanner is None:
+            snap = core.scan_youtube_window(
+                self.backend, int(self.winId()), self.youtube_hwnd, self.clock.time(), self.session_id,
+                root_pid=self.worker_root_pid(),
+            )
+            self._apply_window_snapshot(snap)
+        else:
+            self._check_fullscreen()
+        self._watchdog_check()
+
+    @QtCore.pyqtSlot(object)
+    def _apply_window_snapshot(self, snap: core.WindowSnapshot):
+        """탐색 스냅샷에서 바뀐 부분만 반영"""
+        if not self.is_playing or self._start_pending or snap.generation != self.session_id:
             return
 
-        hwnd, title = core.find_youtube_window(exclude_hwnd=int(self.winId()))
-        if not hwnd or not title:
+        if snap.tracked_hwnd is not None and snap.tracked_hwnd == self.youtube_hwnd:
+            self.tracked_alive = snap.tracked_alive
+        if snap.cpu_percent is not None:
+            self.watchdog.observe_cpu(snap.scanned_at, snap.cpu_percent)
+
+        if not snap.hwnd or not snap.raw_title:
             return
 
-        pid_val = QtCore.QVariant()  # dummy
-        pid_dword = core.wintypes.DWORD()
-        core.GetWindowThreadProcessId(hwnd, core.ctypes.byref(pid_dword))
-        if pid_dword.value and pid_dword.value != self.youtube_pid:
-            self.youtube_pid = pid_dword.value
+        if snap.pid and snap.pid != self.youtube_pid:
+            self.youtube_pid = snap.pid
             core.write_log(f"YouTube 창 PID 감지: {self.youtube_pid}")
 
-        if not self.youtube_hwnd or int(self.youtube_hwnd) != int(hwnd):
-            self.youtube_hwnd = hwnd
-            self.youtube_detect_time = time.time()
-            core.write_log(f"YouTube 창 핸들 감지: hwnd={hwnd}, title={title}")
+        if self.youtube_hwnd != snap.hwnd:
+            self.youtube_hwnd = snap.hwnd
+            self.youtube_detect_time = snap.detected_at
+            self.tracked_alive = True
+            if self.scanner is not None:
+                self.scanner.set_target(self.session_id, self.worker_root_pid(), snap.hwnd)
+            self._publish(core.WindowDetected, snap.hwnd, snap.pid, snap.raw_title)
 
-        cleaned = core.clean_youtube_title(title)
+        cleaned = snap.title
         if cleaned and cleaned != self.current_track_title:
+            if self._launch_started_at is not None:
+                self.lead_model.record(self.clock.time() - self._launch_started_at)
+                self._launch_started_at = None
             self.current_track_title = cleaned
-            self.track_label.setText(cleaned)
-            self._append_status(f"현재 곡: {cleaned}")
-            core.write_log(f"현재 곡 인식/갱신: {cleaned}")
+            self._publish(core.TrackChanged, cleaned)
+
+        self._check_fullscreen()
 
+    def _check_fullscreen(self):
         # 3초 이상 + 제목 잡힘 → 전체화면 토글(F)
         if (
             not self.fullscreen_done
             and self.youtube_hwnd
             and self.youtube_detect_time
-            and (time.time() - self.youtube_detect_time) >= 3.0
+            and (self.clock.time() - self.youtube_detect_time) >= 3.0
             and self.current_track_title
             and self.current_track_title != self.windowTitle()
         ):
-            core.write_log("전체화면 조건 만족 → F 키 전송")
-            core.send_f_to_window(self.youtube_hwnd)
+            self._publish(core.FullscreenSent, int(self.youtube_hwnd))
+            self.backend.send_fullscreen(self.youtube_hwnd)
             self.fullscreen_done = True
 
+    # ---------- Playback watchdog ----------
+
+    def _watchdog_check(self):
+        now = self.clock.time()
+        if self.scanner is None:
+            if self.cpu_sampler is None and self.worker_root_pid():
+                self.cpu_sampler = self.backend.cpu_sampler(self.worker_root_pid())
+            if self.cpu_sampler is not None and self.watchdog.cpu_sample_due(now):
+                self.watchdog.observe_cpu(now, self.cpu_sampler.sample(now))
+
+        window_alive = self.tracked_alive if self.youtube_hwnd else None
+        action = self.watchdog.observe(now, self.current_track_title, window_alive)
+        if action == core.PlaybackWatchdog.ACTION_RELOAD:
+            self._append_status("재생 정지 감지 → 페이지 새로고침")
+            self.backend.send_reload(self.youtube_hwnd)
+            # 새로고침 후 다시 전체화면
+            self.fullscreen_done = False
+            self.youtube_detect_time = now
+        elif action == core.PlaybackWatchdog.ACTION_RELAUNCH:
+            self._append_status("재생 정지 감지 → 브라우저 재실행")
+            self._relaunch_browser()
+
+    def worker_root_pid(self):
+        # 시작 대기 중이면 worker는 종료 중인 이전 브라우저
+        proc = getattr(self.worker, "proc", None) if self._worker_running and not self._start_pending else None
+        return proc.pid if proc else None
+
+    def _update_scanner_target(self):
+        if self.scanner is None:
+            return
+        if self.is_playing:
+            self.scanner.set_target(self.session_id, self.worker_root_pid(), self.youtube_hwnd)
+        else:
+            self.scanner.set_target(None)
+
+    def _relaunch_browser(self, url: str = None):
+        core.write_log("브라우저 재실행 요청")
+        if not self._worker_running:
+            self._close_browser()
+            self._launch_worker(url)
+            return
+        # 이전 워커가 브라우저를 닫고 프로필 정리를 끝낸 뒤(_on_worker_finished) 새로 실행
+        self._relaunch_pending = True
+        self._relaunch_url = url
+        if self.stop_event:
+            self.stop_event.set()
+
+    # ---------- Fallback audio ----------
+
+    def _start_fallback(self, reason: str):
+        # 세션마다 한 번만 시도 (캐시가 비어 있으면 매초 로그가 쌓이지 않도록)
+        if self.fallback is None or self.fallback.active or self._fallback_session == self.session_id:
+            return
+        self._fallback_session = self.session_id
+        if self.fallback.start(reason):
+            self._append_status(f"브라우저 재생 실패 → 로컬 음원으로 대체 재생 ({reason})")
+            self._set_label(self.state_label, "대체 재생 중")
+
+    def _check_fallback_deadline(self):
+        if (
+            self.fallback is not None
+            and self.is_playing
+            and not self._start_pending
+            and not self.current_track_title
+            and not self.fallback.active
+            and self.clock.time() - self.watchdog.session_start >= self.fallback_deadline
+        ):
+            self._start_fallback("no_title")
+
     # ---------- Controls ----------
 
     def _append_status(self, msg: str):
-        self.status_label.setText(msg)
+        self._set_label(self.status_label, msg)
 
     def _toggle_test_mode(self):
         if self.is_playing:
@@ -705,90 +1075,151 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # ---------- Play / Stop ----------
 
-    def start_playback(self, auto_trigger: bool = False):
+    def start_playback(self, auto_trigger: bool = False, interactive: bool = True):
+        """interactive=False: 다른 실행(--start) 요청 → 무인 장비이므로 안내창 대신 로그만"""
+        def refuse(msg: str, warning: bool = False):
+            if not interactive:
+                core.write_log(f"재생 시작 요청 거부: {msg}")
+            elif warning:
+                QtWidgets.QMessageBox.warning(self, "알림", msg)
+            else:
+                QtWidgets.QMessageBox.information(self, "알림", msg)
+
         if self.is_playing:
             if not auto_trigger:
-                QtWidgets.QMessageBox.information(self, "알림", "이미 재생 중입니다.")
+                refuse("이미 재생 중입니다.")
             return
 
         # 자동 모드일 때 수동 시작 제한(시간 전에는 막기)
-        now = datetime.datetime.now()
+        now = self.clock.now()
         if self.mode == self.MODE_AUTO and not auto_trigger:
             today = now.date()
             start_dt = datetime.datetime.combine(today, datetime.time(self.start_h, self.start_m))
             end_dt = datetime.datetime.combine(today, datetime.time(self.end_h, self.end_m))
             if now < start_dt:
-                QtWidgets.QMessageBox.information(self, "알림", f"자동 시간 모드는 {self.start_h:02d}:{self.start_m:02d} 이후에만 시작할 수 있습니다.")
+                refuse(f"자동 시간 모드는 {self.start_h:02d}:{self.start_m:02d} 이후에만 시작할 수 있습니다.")
                 return
             if now >= end_dt:
-                QtWidgets.QMessageBox.warning(self, "알림", f"오늘 자동 재생 종료 시각({self.end_h:02d}:{self.end_m:02d})을 지났습니다.")
+                refuse(f"오늘 자동 재생 종료 시각({self.end_h:02d}:{self.end_m:02d})을 지났습니다.", warning=True)
                 return
 
+        self._launch_started_at = self.clock.time()
+        self.last_play_date = now.date()
+        if self._worker_running:
+            # 이전 워커가 브라우저 종료/프로필 정리 중: 새 브라우저까지 정리되지 않도록 끝난 뒤 실행
+            core.write_log("이전 플레이어 종료 대기 → 끝나면 재생 시작")
+            self._start_pending = True
+        else:
+            self._launch_worker()
+
+        self.is_playing = True
+        self._set_label(self.state_label, "재생 중")
+        self._set_label(self.running_label, "실행 중...")
+        self._set_style(self.running_label, "color: #7bd88f;")
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self._set_animations(True)
+
+        self._append_status("재생 시작")
+        if self.mode == self.MODE_AUTO_TEST:
+            self._reset_timer()
+            self.countdown_timer.start(1000)
+
+        self._update_schedule_status()
+
+    def _launch_worker(self, url: str = None):
         # 상태 초기화
         self.current_track_title = ""
-        self.track_label.setText("대기 중...")
+        self._set_label(self.track_label, "대기 중...")
         self.fullscreen_done = False
         self.youtube_pid = None
         self.youtube_hwnd = None
         self.youtube_detect_time = None
+        self.cpu_sampler = None
+        self.tracked_alive = None
+        self.watchdog.begin_session(self.clock.time())
+        self.session_id += 1
+        if self.scanner is not None:
+            self.scanner.set_target(self.session_id)
+
+        name, tracks = core.playlist_for_time(self.playlists, self.clock.now(), self.cfg.get("tracks") or [])
+        self.playlist_name = name
+        self.playlist_tracks = tracks
+        self.current_url = url or core.pick_track_url(self.cfg, tracks)
 
         self.stop_event = threading.Event()
         self.thread = QtCore.QThread(self)
-        self.worker = core.PlayerWorker(self.cfg, self.stop_event)
+        self.worker = self.backend.create_worker(
+            self.cfg, self.stop_event, self.bus, self.session_id, self.current_url,
+        )
         self.worker.moveToThread(self.thread)
 
         self.thread.started.connect(self.worker.run)
-        self.worker.status.connect(self._on_worker_status)
-        self.worker.finished.connect(self._on_worker_finished)
-        self.worker.finished.connect(self.thread.quit)
+        # 워커 스레드에서 바로 세션 id를 실어 다시 emit → GUI 스레드로 큐잉 (워커 삭제와 무관)
+        session = self.session_id
+        self.worker.finished.connect(lambda: self.worker_finished.emit(session), QtCore.Qt.DirectConnection)
+        # quit은 스레드 안전, 종료 대기(wait) 중에도 스레드가 끝날 수 있도록 직접 연결
+        self.worker.finished.connect(self.thread.quit, QtCore.Qt.DirectConnection)
         self.worker.finished.connect(self.worker.deleteLater)
         self.thread.finished.connect(self.thread.deleteLater)
 
+        self._worker_running = True
         self.thread.start()
 
-        self.is_playing = True
-        self.state_label.setText("재생 중")
-        self.running_label.setText("실행 중...")
-        self.running_label.setStyleSheet("color: #7bd88f;")
-        self.start_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.eq_widget.start()
-        self.status_dot.setActive(True)
-
-        self._append_status("재생 시작")
-        if self.mode == self.MODE_AUTO_TEST:
-            self._reset_timer()
-            self.countdown_timer.start(1000)
-
-        self._update_schedule_status()
+    def switch_track(self, reason: str, name: str = None, tracks: list = None) -> bool:
+        """브라우저를 다시 띄우지 않고 실행 중인 창에서 다른 URL로 전환 (tracks 없으면 현재 목록)"""
+        if not self.is_playing or not self._worker_running or self._relaunch_pending or self._start_pending:
+            return False
+        if tracks is None:
+            name, tracks = self.playlist_name, self.playlist_tracks
+        url = core.pick_track_url(self.cfg, tracks, exclude=self.current_url)
+        if not url:
+            return False
+        core.write_log(f"URL 전환 요청({reason}): {name} → {url}")
+        self.playlist_name = name
+        self.playlist_tracks = tracks
+        self.current_url = url
+        self.worker.request_switch(url)
+        return True
+
+    # 워커가 이미 끝난 경우에만 GUI에서 직접 정리 (평소에는 워커 스레드가 정상 종료 처리)
+    def _close_browser(self):
+        root_pid = self.worker_root_pid() or self.youtube_pid
+        if root_pid:
+            self.backend.close_process_tree(root_pid, self.shutdown_timeout)
+        else:
+            core.write_log("브라우저 종료: youtube_pid 없음 → fallback kill_profile_processes")
+            self.backend.kill_profile_processes()
 
     def stop_playback(self, auto: bool = False):
         if not self.is_playing:
             core.write_log("stop_playback 호출됐지만 이미 정지 상태")
             return
 
-        msg = "타이머 종료로 자동 중지" if auto else "사용자 정지"
-        core.write_log(f"stop_playback 호출: {msg}")
-        self._append_status(msg)
+        self._publish(core.Stopping, "auto" if auto else "user")
 
         self.is_playing = False
-        self.state_label.setText("정지")
-        self.running_label.setText("정지됨")
-        self.running_label.setStyleSheet("")
-        self.eq_widget.stop()
-        self.status_dot.setActive(False)
+        self._set_label(self.state_label, "정지")
+        self._set_label(self.running_label, "정지됨")
+        self._set_style(self.running_label, "")
+        self._set_animations(False)
 
         if self.countdown_timer.isActive():
             self.countdown_timer.stop()
 
+        self._relaunch_pending = False
+        self._relaunch_url = None
+        self._start_pending = False
+        self._launch_started_at = None
+        if self.fallback is not None:
+            self.fallback.stop("재생 정지")
+        self._update_scanner_target()
+        self.watchdog.abort()
         if self.stop_event:
             self.stop_event.set()
 
-        if self.youtube_pid:
-            core.kill_process_tree(self.youtube_pid)
-        else:
-            core.write_log("stop_playback: youtube_pid 없음 → fallback kill_profile_processes")
-            core.kill_profile_processes(core.PROFILE_DIR)
+        if not self._worker_running:
+            self._close_browser()
 
         self.stop_button.setEnabled(False)
         self.start_button.setEnabled(True)
@@ -797,20 +1228,68 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # ---------- Worker callbacks ----------
 
-    @QtCore.pyqtSlot(str, bool)
-    def _on_worker_status(self, msg: str, playing: bool):
-        self._append_status(msg)
-        if playing and self.is_playing:
-            self.state_label.setText("재생 중")
+    def _publish(self, event_cls, *args):
+        self.bus.publish(event_cls(*args, session=self.session_id))
 
-    @QtCore.pyqtSlot()
-    def _on_worker_finished(self):
+    def _on_player_event(self, event: core.PlayerEvent):
+        if event.session != self.session_id:
+            return
+        if isinstance(event, core.TrackChanged):
+            if self.fallback is not None and self.fallback.active:
+                self.fallback.stop("브라우저 재생 확인")
+                self._set_label(self.state_label, "재생 중")
+            self._set_label(self.track_label, event.title)
+            self._append_status(f"현재 곡: {event.title}")
+            return
+        self._append_status(event.message())
+        if isinstance(event, core.PlaybackError):
+            self.last_error = {
+                "code": event.code,
+                "message": event.message(),
+                "at": self.clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            if event.code != "switch_failed" and self.is_playing:
+                self._start_fallback(event.code)
+        if isinstance(event, core.Launched):
+            self._update_scanner_target()
+        if isinstance(event, core.TrackSwitched):
+            # 새 탭은 전체화면이 아니므로 제목이 잡히면 다시 F 전송
+            self.fullscreen_done = False
+            self.youtube_detect_time = self.clock.time()
+        if isinstance(event, core.PlaybackError) and event.code == "switch_failed" and self.is_playing:
+            self._relaunch_browser(self.current_url)
+        if isinstance(event, (core.LaunchStarted, core.Launched)) and self.is_playing:
+            self._set_label(self.state_label, "재생 중")
+
+    @QtCore.pyqtSlot(int)
+    def _on_worker_finished(self, session: int):
+        if session != self.session_id:
+            core.write_log("이전 플레이어 스레드 종료")
+            return
+        self._worker_running = False
+        if self._start_pending:
+            self._start_pending = False
+            self._relaunch_pending = False
+            self._relaunch_url = None
+            if self.is_playing:
+                core.write_log("이전 플레이어 스레드 종료 → 재생 시작")
+                self._launch_worker()
+                return
+        if self._relaunch_pending:
+            self._relaunch_pending = False
+            url, self._relaunch_url = self._relaunch_url, None
+            if self.is_playing:
+                core.write_log("이전 플레이어 스레드 종료 → 브라우저 재실행")
+                self._launch_worker(url)
+                return
         core.write_log("플레이어 스레드 종료")
-        self.state_label.setText("정지")
-        self.running_label.setText("정지됨")
-        self.running_label.setStyleSheet("")
-        self.eq_widget.stop()
-        self.status_dot.setActive(False)
+        if self.fallback is not None and self.fallback.active:
+            # 브라우저는 끝났지만 대체 재생은 정지 버튼/종료 시각까지 계속
+            return
+        self._set_label(self.state_label, "정지")
+        self._set_label(self.running_label, "정지됨")
+        self._set_style(self.running_label, "")
+        self._set_animations(False)
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         if self.countdown_timer.isActive():